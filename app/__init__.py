@@ -1,23 +1,72 @@
 from flask import Flask
 from flask_socketio import SocketIO
 from app.config import Config
+from app.utils.json_provider import OrjsonProvider, orjson
 import os
 
-# Create SocketIO instance globally so it can be imported by other modules
-socketio = SocketIO()
+
+class _OrjsonSocketIOJson:
+    """Module-like json shim handing socketio payloads to orjson.
+
+    python-socketio only needs dumps/loads; extra stdlib-json keyword
+    arguments (separators etc.) are accepted and ignored.
+    """
+
+    @staticmethod
+    def dumps(obj, *args, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    @staticmethod
+    def loads(data, *args, **kwargs):
+        return orjson.loads(data)
+
+
+# Create SocketIO instance globally so it can be imported by other modules.
+# Event emits serialize with orjson when available — on busy scenes the
+# JSON encode dominates the emit path.
+if orjson is not None:
+    socketio = SocketIO(json=_OrjsonSocketIOJson)
+else:
+    socketio = SocketIO()
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
+
+    # Route diagnostics use logging (see Config.LOG_LEVEL); set DEBUG to
+    # get the verbose upload/stream traces back
+    import logging
+    logging.basicConfig(level=app.config['LOG_LEVEL'])
+
+    # Use orjson for all jsonify responses when available (2-5x faster
+    # serialization on the polled dashboard endpoints)
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
     
     # Ensure upload directories exist
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
     os.makedirs(app.config['OUTPUT_FOLDER'], exist_ok=True)
+
+    # Server-side sessions: the cookie carries only a session id instead
+    # of the whole signed camera-config dict. Falls back to Flask's
+    # cookie sessions when Flask-Session is not installed.
+    try:
+        from flask_session import Session
+        Session(app)
+    except ImportError:
+        pass
     
-    # Initialize SocketIO with the app
-    socketio.init_app(app, cors_allowed_origins="*", async_mode='threading')
-    # socketio.init_app(app, cors_allowed_origins="*")
+    # Initialize SocketIO with the app (async mode is configurable —
+    # see Config.SOCKETIO_ASYNC_MODE)
+    socketio.init_app(app, cors_allowed_origins="*",
+                      async_mode=app.config['SOCKETIO_ASYNC_MODE'])
     
+    # Single FirebaseService for the whole process — constructed once
+    # here instead of per blueprint module, so the app holds one warm
+    # connection pool and one credentials cache
+    from app.services.firebase_service import FirebaseService
+    app.extensions['firebase'] = FirebaseService()
+
     # Register blueprints
     from app.routes import dashboard_bp, setup_bp
     app.register_blueprint(dashboard_bp)
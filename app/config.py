@@ -9,6 +9,33 @@ class Config:
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', 'uploads')
     OUTPUT_FOLDER = os.environ.get('OUTPUT_FOLDER', 'output')
     MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 524288000))
+
+    # SocketIO async mode. 'eventlet' scales MJPEG + polling to thousands
+    # of clients via greenlets (~8KB stacks vs ~8MB thread stacks) but
+    # requires eventlet.monkey_patch() before any other import (run.py
+    # handles this). 'threading' remains the default because the
+    # processing pipeline runs CPU-heavy inference in real OS threads.
+    SOCKETIO_ASYNC_MODE = os.environ.get('SOCKETIO_ASYNC_MODE', 'threading')
+
+    # Route diagnostics log at DEBUG; run production at WARNING so the
+    # per-request log calls reduce to an isEnabledFor check
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'WARNING')
+
+    # Server-side sessions (Flask-Session). The multi-camera config dict
+    # (video paths, line points) would otherwise be re-signed and shipped
+    # in a Set-Cookie header on every mutation, and risks the 4KB cookie
+    # limit as it grows. 'redis' is supported for multi-worker deployments.
+    SESSION_TYPE = os.environ.get('SESSION_TYPE', 'filesystem')
+    SESSION_FILE_DIR = os.environ.get('SESSION_FILE_DIR', 'flask_session')
+
+    # Redis backend: session reads/writes become O(1) GET/SET against a
+    # shared store, so multiple gunicorn workers see the same camera
+    # config. Set SESSION_TYPE=redis and point REDIS_URL at the server.
+    if SESSION_TYPE == 'redis':
+        import redis
+        SESSION_REDIS = redis.from_url(
+            os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+        )
     
     # Firebase
     FIREBASE_DATABASE_URL = os.environ.get('FIREBASE_DATABASE_URL')
@@ -27,9 +54,26 @@ class Config:
     FRAME_WIDTH = 672
     FRAME_HEIGHT = 448
 
+    # Dashboard MJPEG preview — smaller than processing resolution since
+    # JPEG encode cost and bandwidth scale with pixel count
+    PREVIEW_WIDTH = int(os.environ.get('PREVIEW_WIDTH', 480))
+    PREVIEW_HEIGHT = int(os.environ.get('PREVIEW_HEIGHT', 320))
+
     # Batch inference — tuning knobs for the shared BatchInferenceEngine
     BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', 40))
     BATCH_MAX_WAIT_MS = float(os.environ.get('BATCH_MAX_WAIT_MS', 15.0))
+
+    # FP16 inference for the PyTorch (.pt) backend on CUDA — halves
+    # memory bandwidth and engages tensor cores. TensorRT engines bake
+    # their precision in at build time, so this flag doesn't affect them.
+    # Set USE_FP16=0 to A/B against full precision.
+    USE_FP16 = os.environ.get('USE_FP16', '1') == '1'
+
+    # Run full detection every Nth frame; in-between frames only
+    # propagate ByteTrack's Kalman filter. 2 halves the dominant
+    # inference cost at some tracking-accuracy risk, so the default
+    # stays at 1 (detect every frame) until validated per deployment.
+    DETECT_EVERY = int(os.environ.get('DETECT_EVERY', 1))
     
     # Vehicle capacity mapping
     VEHICLE_CAPACITY = {
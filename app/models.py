@@ -1,21 +1,32 @@
+from collections import deque
 from datetime import datetime
 from typing import Dict, Optional
 
+# Number of most-recent events kept for the dashboard event log
+RECENT_EVENTS_LIMIT = 50
+
+
 class VehicleEvent:
-    """Represents a single vehicle detection event"""
-    def __init__(self, vehicle_type: str, direction: str, 
-                 timestamp: datetime, seats_min: int, seats_max: int):
+    """Represents a single vehicle detection event.
+
+    The timestamp is stored as epoch seconds — a plain float instead of
+    a datetime object on the per-crossing hot path — and only formatted
+    to ISO 8601 when the event is serialized for Firebase or the
+    dashboard.
+    """
+    def __init__(self, vehicle_type: str, direction: str,
+                 timestamp: float, seats_min: int, seats_max: int):
         self.vehicle_type = vehicle_type
         self.direction = direction  # 'IN' or 'OUT'
-        self.timestamp = timestamp
+        self.timestamp = timestamp  # epoch seconds
         self.seats_min = seats_min
         self.seats_max = seats_max
-    
+
     def to_dict(self) -> Dict:
         return {
             'vehicle_type': self.vehicle_type,
             'direction': self.direction,
-            'timestamp': self.timestamp.isoformat(),
+            'timestamp': datetime.fromtimestamp(self.timestamp).isoformat(),
             'seats_min': self.seats_min,
             'seats_max': self.seats_max
         }
@@ -28,42 +39,53 @@ class SessionData:
         self.start_time = datetime.now()
         self.vehicle_counts = {}  # {vehicle_type: count}
         self.events = []  # List of VehicleEvent
+        # Bounded buffer of the newest events so the event-log endpoint
+        # never has to slice the full history
+        self.recent_events = deque(maxlen=RECENT_EVENTS_LIMIT)
         self.line_coordinates = None
-        
+        # Incremental counters so get_statistics() is O(1) regardless of
+        # session length (long sessions accumulate thousands of events)
+        self._counters = {
+            'vehicles_in': 0,
+            'vehicles_out': 0,
+            'people_min_in': 0,
+            'people_max_in': 0,
+            'people_min_out': 0,
+            'people_max_out': 0
+        }
+        self._distribution = {}  # {vehicle_type: count}
+
     def add_event(self, event: VehicleEvent):
-        """Add event and maintain chronological order"""
+        """Add event, maintain chronological order, and update running counters"""
         self.events.append(event)
         # Keep events sorted by timestamp for accurate statistics and display
         self.events.sort(key=lambda e: e.timestamp)
-        
-    def get_statistics(self) -> Dict:
-        """Calculate current statistics from chronologically ordered events"""
-        # Events are already sorted by timestamp in add_event()
-        vehicles_in = sum(1 for e in self.events if e.direction == 'IN')
-        vehicles_out = sum(1 for e in self.events if e.direction == 'OUT')
-        
-        people_min = sum(e.seats_min for e in self.events if e.direction == 'IN')
-        people_max = sum(e.seats_max for e in self.events if e.direction == 'IN')
-        
-        people_min_out = sum(e.seats_min for e in self.events if e.direction == 'OUT')
-        people_max_out = sum(e.seats_max for e in self.events if e.direction == 'OUT')
 
-        # on_site_min = max(0, people_min - people_min_out)
-        # on_site_max = max(0, people_max - people_max_out)
+        # Update running counters (statistics are order-independent sums)
+        if event.direction == 'IN':
+            self._counters['vehicles_in'] += 1
+            self._counters['people_min_in'] += event.seats_min
+            self._counters['people_max_in'] += event.seats_max
+        else:
+            self._counters['vehicles_out'] += 1
+            self._counters['people_min_out'] += event.seats_min
+            self._counters['people_max_out'] += event.seats_max
+
+        self._distribution[event.vehicle_type] = self._distribution.get(event.vehicle_type, 0) + 1
+        self.recent_events.append(event)
+
+    def get_statistics(self) -> Dict:
+        """Read current statistics from the running counters (O(1))"""
+        c = self._counters
         return {
-            'vehicles_in': vehicles_in,
-            'vehicles_out': vehicles_out,
-            'net_vehicles': vehicles_in - vehicles_out,
-            'people_on_site_min': people_min - people_min_out,
-            'people_on_site_max': people_max - people_max_out,
-            # 'people_on_site_min': on_site_min,
-            # 'people_on_site_max': on_site_max,
+            'vehicles_in': c['vehicles_in'],
+            'vehicles_out': c['vehicles_out'],
+            'net_vehicles': c['vehicles_in'] - c['vehicles_out'],
+            'people_on_site_min': c['people_min_in'] - c['people_min_out'],
+            'people_on_site_max': c['people_max_in'] - c['people_max_out'],
             'vehicle_distribution': self._get_distribution()
         }
-    
+
     def _get_distribution(self) -> Dict[str, int]:
-        """Get vehicle type distribution"""
-        distribution = {}
-        for event in self.events:
-            distribution[event.vehicle_type] = distribution.get(event.vehicle_type, 0) + 1
-        return distribution
\ No newline at end of file
+        """Get vehicle type distribution (copy of the running tally)"""
+        return dict(self._distribution)
\ No newline at end of file
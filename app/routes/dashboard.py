@@ -1,18 +1,32 @@
-from flask import Blueprint, render_template, jsonify, session, Response, request
+from flask import Blueprint, render_template, jsonify, session, Response, request, current_app
 from flask_socketio import emit
 from app import socketio
-from app.services.firebase_service import FirebaseService
-from app.services.processing_service import get_job_status
+from app.services.session_cache import SessionSnapshotCache
+from app.services.frame_broadcaster import FrameBroadcaster
 from app.models import SessionData
-from app.state import frame_queues
+from app.state import session_subscribers
+
+# NOTE: app.services.processing_service pulls in cv2 / torch /
+# ultralytics; it is imported lazily inside handlers so API-only
+# workers boot without the heavy CV stack
 from datetime import datetime
 from collections import defaultdict
-import cv2
-import queue
-import time
+import logging
+import threading
 
 dashboard_bp = Blueprint('dashboard', __name__)
-firebase_service = FirebaseService()
+
+# Lazy %s formatting keeps disabled levels to a single bool check — the
+# stream handlers otherwise pay a string build per client event
+logger = logging.getLogger(__name__)
+
+# Precomputed multipart framing for the MJPEG stream — built once instead
+# of re-concatenating the literals around every frame
+_MJPEG_PREFIX = b'--frame\r\nContent-Type: image/jpeg\r\n\r\n'
+_MJPEG_SUFFIX = b'\r\n'
+
+session_cache = SessionSnapshotCache.get_instance()
+frame_broadcaster = FrameBroadcaster.get_instance()
 
 @dashboard_bp.route('/')
 def index():
@@ -25,10 +39,11 @@ def index():
     
     if session_id:
         # Check if there's an active processing job
+        from app.services.processing_service import get_job_status
         processing_status = get_job_status(session_id)
         
-        # Get session data from Firebase
-        session_data = firebase_service.get_session_data(session_id)
+        # Get session data from the in-memory snapshot cache
+        session_data = session_cache.get(session_id)
     
     return render_template('dashboard.html', 
                          session_data=session_data,
@@ -36,25 +51,42 @@ def index():
                          location=location,
                          processing_status=processing_status)
 
+def _cached_json(payload, session_id, version):
+    """Build a JSON response with a weak ETag and short max-age.
+
+    Dashboards poll on a 1-2s interval; a 304 lets the server skip
+    serialization and the client skip re-parsing identical JSON.
+    """
+    etag = f"{session_id}:{version}"
+    if request.if_none_match.contains_weak(etag):
+        return Response(status=304)
+
+    response = jsonify(payload)
+    response.set_etag(etag, weak=True)
+    response.cache_control.max_age = 1
+    response.cache_control.must_revalidate = True
+    return response
+
+
 @dashboard_bp.route('/api/statistics')
 def get_statistics():
     """API endpoint for real-time statistics"""
     session_id = session.get('current_session')
-    
+
     if not session_id:
         return jsonify({'error': 'No active session'}), 404
-    
-    data = firebase_service.get_session_data(session_id)
+
+    data, version = session_cache.get_with_version(session_id)
     if not data:
-        return jsonify({
+        return _cached_json({
             'vehicles_in': 0,
             'vehicles_out': 0,
             'net_vehicles': 0,
             'people_on_site_min': 0,
             'people_on_site_max': 0,
             'vehicle_distribution': {}
-        })
-    return jsonify(data.get('statistics', {}))
+        }, session_id, version)
+    return _cached_json(data.get('statistics', {}), session_id, version)
 
 @dashboard_bp.route('/api/events')
 def get_events():
@@ -64,14 +96,29 @@ def get_events():
     if not session_id:
         return jsonify({'error': 'No active session'}), 404
     
-    data = firebase_service.get_session_data(session_id)
+    data, version = session_cache.get_with_version(session_id)
     if not data:
-        return jsonify([])
-    
+        return _cached_json([], session_id, version)
+
+    return _cached_json(_recent_events_from(data), session_id, version)
+
+
+def _recent_events_from(data):
+    """Merge the bounded recent-events buffers from both cameras.
+
+    Prefers the constant-size recent_events nodes kept in sync by
+    FirebaseService.save_session; falls back to slicing the full events
+    list for sessions saved before those nodes existed.
+    """
+    recent = []
+    for key in ('recent_events', 'recent_events_ENTRY', 'recent_events_EXIT'):
+        recent.extend(data.get(key) or [])
+    if recent:
+        recent.sort(key=lambda e: e.get('timestamp', ''))
+        return recent[-50:]
+
     events = data.get('events', [])
-    
-    # Return last 50 events
-    return jsonify(events[-50:] if events else [])
+    return events[-50:] if events else []
 
 @dashboard_bp.route('/api/vehicle-distribution')
 def get_vehicle_distribution():
@@ -81,14 +128,14 @@ def get_vehicle_distribution():
     if not session_id:
         return jsonify({'error': 'No active session'}), 404
     
-    data = firebase_service.get_session_data(session_id)
+    data, version = session_cache.get_with_version(session_id)
     if not data:
-        return jsonify({})
-    
+        return _cached_json({}, session_id, version)
+
     stats = data.get('statistics', {})
     distribution = stats.get('vehicle_distribution', {})
-    
-    return jsonify(distribution)
+
+    return _cached_json(distribution, session_id, version)
 
 @dashboard_bp.route('/api/historical-stats')
 def get_historical_stats():
@@ -110,7 +157,7 @@ def get_historical_stats():
         except ValueError:
             pass
 
-    all_sessions = firebase_service.get_recent_sessions(limit=1000)
+    all_sessions = current_app.extensions['firebase'].get_recent_sessions(limit=1000)
     if not all_sessions:
         return jsonify({'labels': [], 'people_min': [], 'people_max': [],
                         'vehicles_in': [], 'vehicles_out': []})
@@ -162,6 +209,31 @@ def get_historical_stats():
         'vehicles_out': [buckets[k]['vehicles_out'] for k in sorted_keys]
     })
 
+@dashboard_bp.route('/api/snapshot')
+def get_snapshot():
+    """Combined statistics/events/distribution payload for one-shot polling.
+
+    Collapses the three separate API polls into a single request so each
+    poll cycle costs one HTTP round trip and one serialization pass.
+    """
+    session_id = session.get('current_session')
+
+    if not session_id:
+        return jsonify({'error': 'No active session'}), 404
+
+    data, version = session_cache.get_with_version(session_id)
+    if not data:
+        data = {}
+
+    stats = data.get('statistics', {})
+    return _cached_json({
+        'statistics': stats,
+        'events': _recent_events_from(data),
+        'distribution': stats.get('vehicle_distribution', {}),
+        'version': version
+    }, session_id, version)
+
+
 @dashboard_bp.route('/api/processing-status')
 def get_processing_status():
     """API endpoint to check processing status"""
@@ -170,6 +242,7 @@ def get_processing_status():
     if not session_id:
         return jsonify({'error': 'No active session'}), 404
     
+    from app.services.processing_service import get_job_status
     status = get_job_status(session_id)
     if status:
         return jsonify(status)
@@ -178,48 +251,36 @@ def get_processing_status():
 
 
 def generate_frames(camera_role):
-    """Generator function for streaming MJPEG frames"""
-    frame_queue = frame_queues.get(camera_role)
-    if not frame_queue:
-        print(f"No frame queue found for camera: {camera_role}")
+    """Generator function for streaming MJPEG frames.
+
+    Frames are encoded once per camera by the shared FrameBroadcaster;
+    every connected viewer yields the same bytes from its latest-frame
+    slot, so adding viewers adds no encode cost.
+    """
+    slot = frame_broadcaster.get_slot(camera_role)
+    if not slot:
+        logger.warning("No frame queue found for camera: %s", camera_role)
         return
-    
-    print(f"Starting frame stream for {camera_role} camera")
-    last_frame_time = time.time()
-    
+
+    logger.debug("Starting frame stream for %s camera", camera_role)
+    last_version = slot.version
+
     while True:
         try:
-            # Get frame from queue with timeout
-            frame = frame_queue.get(timeout=5.0)
-            
-            # Encode frame as JPEG
-            ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-            if not ret:
-                print(f"Failed to encode frame for {camera_role}")
+            # Wait for a frame newer than the one we last sent
+            frame_bytes, last_version = slot.wait_for_newer(last_version, timeout=5.0)
+            if frame_bytes is None:
+                # No frames available - continue waiting
                 continue
-            
-            # Convert to bytes
-            frame_bytes = buffer.tobytes()
-            
-            # Calculate FPS for monitoring
-            current_time = time.time()
-            fps = 1.0 / (current_time - last_frame_time) if (current_time - last_frame_time) > 0 else 0
-            last_frame_time = current_time
-            
-            if frame_bytes:
-                # Yield frame in multipart format
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-            
-        except queue.Empty:
-            # No frames available - continue waiting
-            time.sleep(0.1)
-            continue
+
+            # Yield frame in multipart format (single join allocation)
+            yield b''.join((_MJPEG_PREFIX, frame_bytes, _MJPEG_SUFFIX))
+
         except GeneratorExit:
-            print(f"Client disconnected from {camera_role} stream")
+            logger.debug("Client disconnected from %s stream", camera_role)
             break
         except Exception as e:
-            print(f"Stream error for {camera_role}: {e}")
+            logger.warning("Stream error for %s: %s", camera_role, e)
             break
 
 
@@ -229,7 +290,7 @@ def video_feed(camera_role):
     if camera_role not in ['ENTRY', 'EXIT']:
         return jsonify({'error': 'Invalid camera role'}), 404
     
-    print(f"Video feed requested for {camera_role} camera")
+    logger.debug("Video feed requested for %s camera", camera_role)
     
     return Response(
         generate_frames(camera_role),
@@ -238,16 +299,34 @@ def video_feed(camera_role):
 
 
 # WebSocket event handlers
+
+# Session rooms each connected client has joined, so disconnects can
+# decrement the shared subscriber counts without a room lookup
+_sid_sessions = {}
+
+# Guards the _sid_sessions / session_subscribers read-modify-write:
+# socketio handlers run on worker threads, so two concurrent
+# joins/disconnects could otherwise interleave and leave a count stale
+# (a count stuck above zero keeps the emit path hot forever)
+_subscribers_lock = threading.Lock()
+
 @socketio.on('connect')
 def handle_connect():
     """Handle client connection"""
-    print('Client connected')
+    logger.debug('Client connected')
     emit('connected', {'status': 'connected'})
 
 @socketio.on('disconnect')
 def handle_disconnect():
     """Handle client disconnection"""
-    print('Client disconnected')
+    logger.debug('Client disconnected')
+    with _subscribers_lock:
+        for session_id in _sid_sessions.pop(request.sid, ()):
+            remaining = session_subscribers.get(session_id, 0) - 1
+            if remaining > 0:
+                session_subscribers[session_id] = remaining
+            else:
+                session_subscribers.pop(session_id, None)
 
 @socketio.on('join_session')
 def handle_join_session(data):
@@ -256,7 +335,12 @@ def handle_join_session(data):
     session_id = data.get('session_id')
     if session_id:
         join_room(session_id)
-        print(f'Client joined session room: {session_id}')
+        with _subscribers_lock:
+            joined = _sid_sessions.setdefault(request.sid, set())
+            if session_id not in joined:
+                joined.add(session_id)
+                session_subscribers[session_id] = session_subscribers.get(session_id, 0) + 1
+        logger.debug('Client joined session room: %s', session_id)
         emit('session_joined', {'session_id': session_id})
 
 @socketio.on('request_status')
@@ -264,6 +348,7 @@ def handle_request_status(data):
     """Handle status request from client"""
     session_id = data.get('session_id')
     if session_id:
+        from app.services.processing_service import get_job_status
         status = get_job_status(session_id)
         if status:
             emit('processing_status', status)
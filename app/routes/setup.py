@@ -1,19 +1,53 @@
-from flask import Blueprint, render_template, request, jsonify, session
+from flask import Blueprint, render_template, request, jsonify, session, Response
 from werkzeug.utils import secure_filename
 from datetime import datetime
+from functools import lru_cache
+import logging
 import os
+import shutil
+import subprocess
 import uuid
-from app.services.firebase_service import FirebaseService
-from app.services.processing_service import start_processing, get_job_status, stop_processing
 from app.config import Config
-import cv2
-import base64
+from app.utils.first_frame import extract_first_frame_jpeg, PREVIEW_JPEG_QUALITY
+
+# NOTE: cv2 and app.services.processing_service (which pulls in torch /
+# ultralytics) are imported lazily inside the handlers that need them,
+# so API-only workers don't pay their import time and resident memory
 from urllib.parse import urlparse
 
 setup_bp = Blueprint('setup', __name__)
 
-# Initialize services
-firebase_service = FirebaseService()
+# Diagnostics go through logging with lazy %s formatting: when the level
+# is off (production runs at WARNING) each call is a single bool check
+# instead of an f-string build + stdout write per request
+logger = logging.getLogger(__name__)
+
+# Live-stream captures opened during configure_stream, kept open and
+# handed to start_processing so the pipeline skips a second RTSP
+# handshake: {(session_id, camera_role): cv2.VideoCapture}
+_stream_caps = {}
+
+# secure_filename scans the name character-by-character in pure Python;
+# memoize it so re-uploads of the same file skip the scan
+_secure_filename = lru_cache(maxsize=1024)(secure_filename)
+
+
+def _probe_video_header(path):
+    """Validate an uploaded container by ffprobe-ing the on-disk file.
+
+    Probing by path lets ffprobe seek to wherever the container keeps
+    its index — non-faststart MP4s put the moov atom at the end, so a
+    header-bytes-only probe would misreport them as corrupt. It still
+    only reads metadata, not a decode, so broken uploads fail here
+    instead of in the first-frame endpoint. Returns True when ffprobe
+    is unavailable.
+    """
+    try:
+        proc = subprocess.run(['ffprobe', '-v', 'error', '-i', path],
+                              capture_output=True, timeout=5)
+    except (OSError, subprocess.TimeoutExpired):
+        return True
+    return proc.returncode == 0
 
 @setup_bp.route('/')
 def configuration():
@@ -24,34 +58,59 @@ def configuration():
 def upload_video():
     """Handle video upload"""
     try:
-        print(f"Upload request received. Files: {request.files.keys()}, Form: {request.form.keys()}")
-        
+        logger.debug("Upload request received. Files: %s, Form: %s",
+                     request.files.keys(), request.form.keys())
+
         if 'video' not in request.files:
-            print("Error: No video file in request")
+            logger.debug("Error: No video file in request")
             return jsonify({'error': 'No video file'}), 400
-        
+
         file = request.files['video']
         if file.filename == '':
-            print("Error: Empty filename")
+            logger.debug("Error: Empty filename")
             return jsonify({'error': 'No selected file'}), 400
-        
+
         # Get camera role from form data
         camera_role = request.form.get('camera_role', 'ENTRY')
-        print(f"Uploading video for camera: {camera_role}")
+        logger.debug("Uploading video for camera: %s", camera_role)
         
         # Save uploaded file
-        filename = secure_filename(file.filename)
+        filename = _secure_filename(file.filename)
         session_id = session.get('current_session')
         if not session_id:
             session_id = str(uuid.uuid4())
             session['current_session'] = session_id
-            print(f"Created new session: {session_id}")
+            logger.debug("Created new session: %s", session_id)
         
-        upload_path = os.path.join(Config.UPLOAD_FOLDER, f"{session_id}_{camera_role}_{filename}")
-        print(f"Saving to: {upload_path}")
+        # Single f-string build — os.path.join's per-component separator
+        # normalization buys nothing for a flat upload directory
+        upload_path = f"{Config.UPLOAD_FOLDER}{os.sep}{session_id}_{camera_role}_{filename}"
+        logger.debug("Saving to: %s", upload_path)
         
-        file.save(upload_path)
-        print(f"File saved successfully. Size: {os.path.getsize(upload_path)} bytes")
+        # Stream to disk in 4MB chunks — file.save() copies with a small
+        # default buffer, turning a 500MB upload into ~32k read/write calls
+        with open(upload_path, 'wb') as dst:
+            shutil.copyfileobj(file.stream, dst, length=4 * 1024 * 1024)
+            # The upload is write-once, read-later (sequentially, by
+            # ffmpeg/OpenCV) — drop it from the page cache so a large
+            # video doesn't evict the model weights and hot working set
+            if hasattr(os, 'posix_fadvise'):
+                dst.flush()
+                os.fsync(dst.fileno())
+                os.posix_fadvise(dst.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        logger.debug("File saved successfully. Size: %s bytes", os.path.getsize(upload_path))
+
+        # Cheap container sanity check on the header bytes so a corrupt
+        # upload is rejected now rather than at first-frame extraction
+        if not _probe_video_header(upload_path):
+            os.remove(upload_path)
+            logger.warning("Rejected invalid video upload for %s camera", camera_role)
+            return jsonify({'error': 'Uploaded file is not a valid video'}), 400
+
+        # New footage invalidates any cached first-frame preview
+        cache_path = _first_frame_cache_path(session_id, camera_role)
+        if cache_path and os.path.exists(cache_path):
+            os.remove(cache_path)
         
         # Initialize camera storage structure if needed
         if 'cameras' not in session:
@@ -62,7 +121,7 @@ def upload_video():
         session['cameras'][camera_role]['has_video'] = True
         session.modified = True
         
-        print(f"Upload successful for {camera_role} camera")
+        logger.debug("Upload successful for %s camera", camera_role)
         return jsonify({
             'success': True,
             'session_id': session_id,
@@ -71,11 +130,16 @@ def upload_video():
         })
         
     except Exception as e:
-        print(f"Upload error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Upload error")
         return jsonify({'error': str(e)}), 500
 
+def _first_frame_cache_path(session_id, camera_role):
+    """Disk-cache location for a session/camera first-frame JPEG."""
+    if not session_id:
+        return None
+    return os.path.join(Config.OUTPUT_FOLDER, f"{session_id}_{camera_role}_first.jpg")
+
+
 @setup_bp.route('/get-first-frame')
 def get_first_frame():
     """Extract and return first frame for line drawing"""
@@ -89,36 +153,56 @@ def get_first_frame():
     if not video_path:
         return jsonify({'error': 'No video uploaded for this camera'}), 400
 
-    print(f"DEBUG: Attempting to read file at: {video_path}")
+    logger.debug("Attempting to read file at: %s", video_path)
     if os.path.exists(video_path):
-        print(f"DEBUG: File exists. Size: {os.path.getsize(video_path)} bytes")
+        logger.debug("File exists. Size: %s bytes", os.path.getsize(video_path))
     else:
-        print(f"DEBUG: ERROR - File does not exist at path!")
+        logger.warning("Video file does not exist at path: %s", video_path)
         return jsonify({'error': 'Video file not found on server'}), 404
-    
-    cap = cv2.VideoCapture(video_path)
-    ret, frame = cap.read()
-    cap.release()
-    
-    if not ret:
-        return jsonify({'error': 'Could not read video'}), 500
-    
-    frame = cv2.resize(frame, (Config.FRAME_WIDTH, Config.FRAME_HEIGHT))
-    
-    # Encode frame as base64
-    _, buffer = cv2.imencode('.jpg', frame)
-    frame_base64 = base64.b64encode(buffer).decode('utf-8')
-    
+
     # Get line points if they exist for this camera
     line_points = camera_data.get('line_points')
-    
+
+    # Metadata only — the frame itself is served as raw JPEG from the
+    # binary route below (base64-in-JSON inflates the payload by 33%)
     return jsonify({
-        'frame': frame_base64,
+        'frame_url': f'/setup/first-frame-image/{camera_role}',
         'width': Config.FRAME_WIDTH,
         'height': Config.FRAME_HEIGHT,
         'line_points': line_points
     })
 
+
+@setup_bp.route('/first-frame-image/<camera_role>')
+def first_frame_image(camera_role):
+    """Serve the first-frame preview as a raw JPEG"""
+    cameras = session.get('cameras', {})
+    video_path = cameras.get(camera_role, {}).get('video_path')
+
+    if not video_path:
+        return jsonify({'error': 'No video uploaded for this camera'}), 400
+
+    # Serve from the per-session disk cache when present (survives
+    # restarts; avoids all video-decode work after the first request)
+    cache_path = _first_frame_cache_path(session.get('current_session'), camera_role)
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path, 'rb') as f:
+            jpeg_bytes = f.read()
+    else:
+        # Grab frame 0 via ffmpeg (cached per path+mtime, cv2 fallback)
+        try:
+            jpeg_bytes = extract_first_frame_jpeg(video_path)
+        except RuntimeError:
+            return jsonify({'error': 'Could not read video'}), 500
+
+        if cache_path:
+            with open(cache_path, 'wb') as f:
+                f.write(jpeg_bytes)
+
+    response = Response(jpeg_bytes, mimetype='image/jpeg')
+    response.cache_control.max_age = 60
+    return response
+
 @setup_bp.route('/save-line', methods=['POST'])
 def save_line():
     """Save counting line coordinates"""
@@ -132,7 +216,12 @@ def save_line():
     # Initialize camera storage if needed
     if 'cameras' not in session:
         session['cameras'] = {'ENTRY': {}, 'EXIT': {}}
-    
+
+    # Re-submitting identical points (common on page reload) doesn't need
+    # a session rewrite — skip the backend serialization entirely
+    if session['cameras'][camera_role].get('line_points') == line_points:
+        return jsonify({'success': True, 'camera_role': camera_role, 'unchanged': True})
+
     # Store line points for specific camera
     session['cameras'][camera_role]['line_points'] = line_points
     session['cameras'][camera_role]['has_line'] = True
@@ -172,12 +261,12 @@ def start_processing_route():
             
             if detected_location:
                 location = detected_location
-                print(f"Auto-detected location '{location}' from camera IP: {ip_address}")
+                logger.debug("Auto-detected location '%s' from camera IP: %s", location, ip_address)
             else:
-                print(f"IP {ip_address} not found in CAMERA_LOCATION_MAP")
-                
+                logger.debug("IP %s not found in CAMERA_LOCATION_MAP", ip_address)
+
         except Exception as e:
-            print(f"Location auto-detection failed: {e}")
+            logger.warning("Location auto-detection failed: %s", e)
             
     # Parse video start time if provided (for historical footage)
     video_start_time = None
@@ -192,6 +281,7 @@ def start_processing_route():
     
     # Start background processing (returns immediately)
     try:
+        from app.services.processing_service import start_processing
         job = start_processing(
             session_id=session_id,
             video_path=video_path,
@@ -199,7 +289,8 @@ def start_processing_route():
             location=location,
             video_start_time=video_start_time,
             camera_role=camera_role,
-            is_live_stream=is_live_stream
+            is_live_stream=is_live_stream,
+            existing_cap=_stream_caps.pop((session_id, camera_role), None)
         )
         
         return jsonify({
@@ -230,8 +321,30 @@ def configure_stream():
         if not stream_url.lower().startswith(('rtsp://', 'http://', 'https://', 'rtmp://')):
             return jsonify({'error': 'Invalid stream URL. Must start with rtsp://, http://, https://, or rtmp://'}), 400
         
-        print(f"Connecting to stream: {stream_url} for {camera_role} camera")
-        
+        # Re-configuring the same URL with a live capture still open is a
+        # no-op: keep the existing connection and cached preview frame
+        session_id = session.get('current_session')
+        camera_data = session.get('cameras', {}).get(camera_role, {})
+        if (session_id
+                and camera_data.get('is_live_stream')
+                and camera_data.get('video_path') == stream_url
+                and (session_id, camera_role) in _stream_caps):
+            return jsonify({
+                'success': True,
+                'session_id': session_id,
+                'camera_role': camera_role,
+                'frame_url': f'/setup/first-frame-image/{camera_role}',
+                'width': Config.FRAME_WIDTH,
+                'height': Config.FRAME_HEIGHT,
+                'line_points': camera_data.get('line_points'),
+                'is_live_stream': True,
+                'unchanged': True
+            })
+
+        logger.debug("Connecting to stream: %s for %s camera", stream_url, camera_role)
+
+        import cv2
+
         # Attempt to connect and capture first frame
         cap = cv2.VideoCapture(stream_url)
         cap.set(cv2.CAP_PROP_BUFFERSIZE, Config.LIVE_STREAM_BUFFER_SIZE)
@@ -241,17 +354,24 @@ def configure_stream():
         
         # Try to read a frame with timeout
         ret, frame = cap.read()
-        cap.release()
-        
+
         if not ret or frame is None:
+            cap.release()
             return jsonify({'error': 'Connected but cannot read from stream.'}), 400
-        
+
         # Create/get session ID
         session_id = session.get('current_session')
         if not session_id:
             session_id = str(uuid.uuid4())
             session['current_session'] = session_id
-        
+
+        # Keep the capture open for the processing pipeline (the RTSP
+        # handshake + first IDR wait can take seconds per open)
+        stale = _stream_caps.pop((session_id, camera_role), None)
+        if stale is not None:
+            stale.release()
+        _stream_caps[(session_id, camera_role)] = cap
+
         # Initialize camera storage if needed
         if 'cameras' not in session:
             session['cameras'] = {'ENTRY': {}, 'EXIT': {}}
@@ -262,20 +382,26 @@ def configure_stream():
         session['cameras'][camera_role]['has_video'] = True
         session.modified = True
         
-        # Prepare frame for line drawing
-        frame = cv2.resize(frame, (Config.FRAME_WIDTH, Config.FRAME_HEIGHT))
-        _, buffer = cv2.imencode('.jpg', frame)
-        frame_base64 = base64.b64encode(buffer).decode('utf-8')
-        
+        # Prepare frame for line drawing — write it into the first-frame
+        # disk cache so the binary route serves it (no base64-in-JSON)
+        frame = cv2.resize(frame, (Config.FRAME_WIDTH, Config.FRAME_HEIGHT),
+                           interpolation=cv2.INTER_AREA)
+        _, buffer = cv2.imencode(
+            '.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), PREVIEW_JPEG_QUALITY]
+        )
+        cache_path = _first_frame_cache_path(session_id, camera_role)
+        with open(cache_path, 'wb') as f:
+            f.write(bytes(buffer))
+
         # Get existing line points if any
         line_points = session['cameras'][camera_role].get('line_points')
-        
-        print(f"Stream configured successfully for {camera_role} camera")
+
+        logger.debug("Stream configured successfully for %s camera", camera_role)
         return jsonify({
             'success': True,
             'session_id': session_id,
             'camera_role': camera_role,
-            'frame': frame_base64,
+            'frame_url': f'/setup/first-frame-image/{camera_role}',
             'width': Config.FRAME_WIDTH,
             'height': Config.FRAME_HEIGHT,
             'line_points': line_points,
@@ -283,9 +409,7 @@ def configure_stream():
         })
         
     except Exception as e:
-        print(f"Stream configuration error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Stream configuration error")
         return jsonify({'error': str(e)}), 500
 
 
@@ -300,7 +424,15 @@ def stop_processing_route():
         if not session_id:
             return jsonify({'error': 'No active session'}), 400
         
+        from app.services.processing_service import stop_processing
         stopped = stop_processing(session_id, camera_role)
+
+        # Release any configured-but-unused stream captures
+        roles = [camera_role] if camera_role else ['ENTRY', 'EXIT']
+        for role in roles:
+            cap = _stream_caps.pop((session_id, role), None)
+            if cap is not None:
+                cap.release()
         
         if stopped:
             return jsonify({
@@ -317,6 +449,7 @@ def stop_processing_route():
 @setup_bp.route('/processing-status/<session_id>')
 def processing_status(session_id):
     """Get the status of a processing job"""
+    from app.services.processing_service import get_job_status
     status = get_job_status(session_id)
     
     if status:
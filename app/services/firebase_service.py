@@ -1,9 +1,15 @@
 import firebase_admin
 from firebase_admin import credentials, db
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import logging
+import threading
 from app.config import Config
 from app.models import SessionData
 
+logger = logging.getLogger(__name__)
+
 class FirebaseService:
     _instance = None
     
@@ -21,83 +27,203 @@ class FirebaseService:
                 'databaseURL': Config.FIREBASE_DATABASE_URL
             })
         self.ref = db.reference('/')
+        # Sessions whose immutable header (location, start_time, line
+        # coordinates) has already been written — skip re-sending those
+        # fields on every periodic statistics push
+        self._initialized_sessions = set()
+        # Last statistics pushed per camera: {session_id: {role: stats}}.
+        # Lets the combined merge run without re-reading the other
+        # camera's stats from Firebase on every update.
+        self._stats_cache = defaultdict(dict)
+        # Executor for fire-and-forget saves (the admin SDK is
+        # thread-safe); callers block on network RTT only via flush()
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='firebase-save')
+        self._pending_futures = []
+        self._futures_lock = threading.Lock()
+        # Cached per-session db references — .child() builds a new
+        # Reference (path parsing/validation) on every call
+        self._session_refs = {}
+
+    def _sref(self, session_id: str):
+        """Return the cached db reference for a session."""
+        ref = self._session_refs.get(session_id)
+        if ref is None:
+            ref = self.ref.child('sessions').child(session_id)
+            self._session_refs[session_id] = ref
+        return ref
     
+    # Backpressure bound for fire-and-forget saves: beyond this many
+    # in-flight futures, statistics-only saves are dropped (the next
+    # tick re-sends fresher numbers anyway); event saves always queue.
+    MAX_PENDING_SAVES = 32
+
+    def save_session_async(self, session_data: SessionData, update_events=False,
+                           camera_role: str = None):
+        """Serialize the session here and submit only the network write.
+
+        The payload is built entirely on the calling thread — the
+        executor thread never touches session_data, which the processing
+        thread keeps mutating (events re-sorts, recent_events appends)
+        while the save is in flight. Returns the Future so callers that
+        care can wait on it; everyone else gets a fire-and-forget write
+        that keeps network RTT off their thread. Use flush() for
+        end-of-session durability.
+        """
+        if not update_events:
+            with self._futures_lock:
+                backlog = sum(1 for f in self._pending_futures if not f.done())
+            if backlog >= self.MAX_PENDING_SAVES:
+                return None  # drop non-critical write under backpressure
+
+        data = self._build_session_update(session_data, update_events, camera_role)
+        future = self._executor.submit(
+            self._update_logged, session_data.session_id, data
+        )
+        with self._futures_lock:
+            self._pending_futures = [f for f in self._pending_futures if not f.done()]
+            self._pending_futures.append(future)
+        return future
+
+    def _update_logged(self, session_id, data):
+        try:
+            self._sref(session_id).update(data)
+        except Exception:
+            logger.exception("Async session update failed for %s", session_id)
+        else:
+            self._mark_initialized(session_id, data)
+
+    def _mark_initialized(self, session_id: str, data: dict) -> None:
+        """Record the one-time session header as durably written.
+
+        Called only after a successful update so transient write
+        failures leave the header pending for the next save.
+        """
+        if 'location' in data:
+            self._initialized_sessions.add(session_id)
+
+    def flush(self, timeout: float = 30.0) -> None:
+        """Wait for all in-flight async saves to complete."""
+        with self._futures_lock:
+            pending = list(self._pending_futures)
+            self._pending_futures = []
+        for future in pending:
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                pass  # already logged by _update_logged
+
     def save_session(self, session_data: SessionData, update_events=False, camera_role: str = None):
         """Save session data. By default, DO NOT overwrite the events list.
-        
+
         If camera_role is provided, saves camera-specific statistics that won't overwrite
         the other camera's data.
         """
-        session_ref = self.ref.child('sessions').child(session_data.session_id)
-        
+        data = self._build_session_update(session_data, update_events, camera_role)
+        self._sref(session_data.session_id).update(data)
+        self._mark_initialized(session_data.session_id, data)
+
+    def _build_session_update(self, session_data: SessionData, update_events,
+                              camera_role: str) -> dict:
+        """Serialize a session into one multi-path update payload.
+
+        Must run on the thread that owns session_data (the processing
+        thread): it iterates events and recent_events, which that thread
+        mutates in place between frames.
+        """
+        session_ref = self._sref(session_data.session_id)
+
         # Get current camera stats
         camera_stats = session_data.get_statistics()
-        
-        data = {
-            'location': session_data.location,
-            'start_time': session_data.start_time.isoformat(),
-            'line_coordinates': session_data.line_coordinates
-        }
+
+        data = {}
+        if session_data.session_id not in self._initialized_sessions:
+            # Immutable header fields: written once per session, not on
+            # every statistics tick. The session is only marked
+            # initialized after an update carrying them succeeds (see
+            # _mark_initialized), so a failed first write retries the
+            # header instead of dropping it forever.
+            data['location'] = session_data.location
+            data['start_time'] = session_data.start_time.isoformat()
+            data['line_coordinates'] = session_data.line_coordinates
         
         if camera_role:
             # Save camera-specific statistics (won't overwrite other camera)
             data[f'statistics_{camera_role}'] = camera_stats
-            
-            # Also update combined statistics by fetching existing and merging
-            self._update_combined_statistics(session_ref, camera_role, camera_stats)
+
+            # Merge combined statistics from the in-process cache and write
+            # them in the same update (one round trip, no re-reads)
+            data['statistics'] = self._update_combined_statistics(
+                session_ref, session_data.session_id, camera_role, camera_stats
+            )
         else:
             # Legacy: save directly to statistics
             data['statistics'] = camera_stats
         
+        # Always sync the bounded recent-events buffer — it is a fixed-size
+        # payload the dashboard event log reads without slicing full history
+        recent = [event.to_dict() for event in session_data.recent_events]
+        if camera_role:
+            data[f'recent_events_{camera_role}'] = recent
+        else:
+            data['recent_events'] = recent
+
         # Only include events if explicitly requested (e.g., at end of session)
         if update_events:
             if camera_role:
                 data[f'events_{camera_role}'] = [event.to_dict() for event in session_data.events]
             else:
                 data['events'] = [event.to_dict() for event in session_data.events]
-            
-        session_ref.update(data)
+
+        return data
     
-    def _update_combined_statistics(self, session_ref, camera_role: str, camera_stats: dict):
-        """Merge camera statistics into combined statistics"""
-        try:
-            # Get existing combined stats
-            existing = session_ref.child('statistics').get() or {}
-            existing_entry = session_ref.child('statistics_ENTRY').get() or {}
-            existing_exit = session_ref.child('statistics_EXIT').get() or {}
-            
-            # Update the appropriate camera stats
-            if camera_role == 'ENTRY':
-                entry_stats = camera_stats
-                exit_stats = existing_exit
-            else:
-                entry_stats = existing_entry
-                exit_stats = camera_stats
-            
-            # Calculate combined statistics
-            combined = {
-                'vehicles_in': (entry_stats.get('vehicles_in', 0) + exit_stats.get('vehicles_in', 0)),
-                'vehicles_out': (entry_stats.get('vehicles_out', 0) + exit_stats.get('vehicles_out', 0)),
-                'net_vehicles': (entry_stats.get('net_vehicles', 0) + exit_stats.get('net_vehicles', 0)),
-                'people_on_site_min': (entry_stats.get('people_on_site_min', 0) + exit_stats.get('people_on_site_min', 0)),
-                'people_on_site_max': (entry_stats.get('people_on_site_max', 0) + exit_stats.get('people_on_site_max', 0)),
-                'vehicle_distribution': self._merge_distributions(
-                    entry_stats.get('vehicle_distribution', {}),
-                    exit_stats.get('vehicle_distribution', {})
-                )
-            }
-            
-            session_ref.child('statistics').set(combined)
-        except Exception as e:
-            print(f"Error updating combined statistics: {e}")
+    def _update_combined_statistics(self, session_ref, session_id: str,
+                                    camera_role: str, camera_stats: dict) -> dict:
+        """Merge camera statistics into combined statistics.
+
+        The other camera's stats come from the in-process cache, seeded
+        with a single Firebase read the first time this session updates —
+        the previous implementation issued three sequential .get() round
+        trips plus a separate .set() write on every statistics push.
+        """
+        cache = self._stats_cache[session_id]
+
+        # One-time seed of the other camera's stats (e.g. after restart)
+        other_role = 'EXIT' if camera_role == 'ENTRY' else 'ENTRY'
+        if other_role not in cache:
+            try:
+                cache[other_role] = session_ref.child(f'statistics_{other_role}').get() or {}
+            except Exception:
+                logger.exception("Error seeding combined statistics cache")
+                cache[other_role] = {}
+
+        cache[camera_role] = camera_stats
+        entry_stats = cache.get('ENTRY', {})
+        exit_stats = cache.get('EXIT', {})
+
+        # Calculate combined statistics
+        return {
+            'vehicles_in': (entry_stats.get('vehicles_in', 0) + exit_stats.get('vehicles_in', 0)),
+            'vehicles_out': (entry_stats.get('vehicles_out', 0) + exit_stats.get('vehicles_out', 0)),
+            'net_vehicles': (entry_stats.get('net_vehicles', 0) + exit_stats.get('net_vehicles', 0)),
+            'people_on_site_min': (entry_stats.get('people_on_site_min', 0) + exit_stats.get('people_on_site_min', 0)),
+            'people_on_site_max': (entry_stats.get('people_on_site_max', 0) + exit_stats.get('people_on_site_max', 0)),
+            'vehicle_distribution': self._merge_distributions(
+                entry_stats.get('vehicle_distribution', {}),
+                exit_stats.get('vehicle_distribution', {})
+            )
+        }
     
     def _merge_distributions(self, entry_dist: dict, exit_dist: dict) -> dict:
-        """Merge vehicle distributions (net = entry - exit)"""
-        all_types = set(list(entry_dist.keys()) + list(exit_dist.keys()))
-        merged = {}
-        for vehicle_type in all_types:
-            merged[vehicle_type] = entry_dist.get(vehicle_type, 0) - exit_dist.get(vehicle_type, 0)
-        return merged
+        """Merge vehicle distributions (net = entry - exit).
+
+        Not collections.Counter: Counter subtraction drops zero and
+        negative counts, and a net outflow of a vehicle type is a valid
+        value here.
+        """
+        return {
+            vehicle_type: entry_dist.get(vehicle_type, 0) - exit_dist.get(vehicle_type, 0)
+            for vehicle_type in entry_dist.keys() | exit_dist.keys()
+        }
     
     def save_event(self, session_id: str, event):
         """
@@ -107,7 +233,7 @@ class FirebaseService:
         Use save_session() with update_events=True to batch events instead.
         Individual writes are expensive - batching reduces Firebase costs by 80-95%.
         """
-        events_ref = self.ref.child('sessions').child(session_id).child('events')
+        events_ref = self._sref(session_id).child('events')
         events_ref.push(event.to_dict())
         
         # Update statistics
@@ -120,8 +246,7 @@ class FirebaseService:
     
     def get_session_data(self, session_id: str):
         """Retrieve session data from Firebase"""
-        session_ref = self.ref.child('sessions').child(session_id)
-        return session_ref.get()
+        return self._sref(session_id).get()
     
     def get_recent_sessions(self, limit: int = 10):
         """Get recent sessions"""
@@ -0,0 +1,138 @@
+"""
+Frame Broadcaster Module
+
+Fans one JPEG encode out to every MJPEG viewer of a camera. A single
+daemon thread per camera pops the newest frame from the shared frame
+queue, encodes it once, and publishes the bytes into a versioned
+latest-frame slot. Each HTTP client waits on the slot's condition and
+yields the shared bytes, so encode cost is O(cameras), not
+O(cameras x viewers), and stale frames are dropped instead of queued.
+"""
+
+import logging
+import queue
+import threading
+from typing import Dict, Optional
+
+from app.config import Config
+from app.state import frame_queues
+from app.utils.jpeg import encode_jpeg
+
+logger = logging.getLogger(__name__)
+
+
+class LatestFrame:
+    """Versioned single-slot holder for the most recent encoded frame."""
+
+    def __init__(self):
+        self.bytes: Optional[bytes] = None
+        self.version: int = 0
+        self.cv = threading.Condition()
+
+    def publish(self, frame_bytes: bytes) -> None:
+        """Store new frame bytes and wake all waiting viewers."""
+        with self.cv:
+            self.bytes = frame_bytes
+            self.version += 1
+            self.cv.notify_all()
+
+    def wait_for_newer(self, last_version: int, timeout: float = 5.0):
+        """
+        Block until a frame newer than *last_version* is available.
+
+        Returns:
+            Tuple of (bytes, version), or (None, last_version) on timeout
+        """
+        with self.cv:
+            if not self.cv.wait_for(
+                lambda: self.version != last_version, timeout=timeout
+            ):
+                return None, last_version
+            return self.bytes, self.version
+
+
+class FrameBroadcaster:
+    """
+    Singleton owning one encoder thread + LatestFrame slot per camera role.
+    Encoder threads are started lazily on first viewer access.
+    """
+
+    _instance: Optional['FrameBroadcaster'] = None
+    _init_lock = threading.Lock()
+
+    def __init__(self):
+        self._slots: Dict[str, LatestFrame] = {}
+        self._threads: Dict[str, threading.Thread] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> 'FrameBroadcaster':
+        if cls._instance is None:
+            with cls._init_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def get_slot(self, camera_role: str) -> Optional[LatestFrame]:
+        """Return the latest-frame slot for a camera, starting its encoder."""
+        frame_queue = frame_queues.get(camera_role)
+        if frame_queue is None:
+            return None
+
+        with self._lock:
+            slot = self._slots.get(camera_role)
+            if slot is None:
+                slot = LatestFrame()
+                self._slots[camera_role] = slot
+                thread = threading.Thread(
+                    target=self._encode_loop,
+                    args=(camera_role, slot),
+                    daemon=True,
+                    name=f"FrameBroadcaster-{camera_role}"
+                )
+                self._threads[camera_role] = thread
+                thread.start()
+            return slot
+
+    def _encode_loop(self, camera_role: str, slot: LatestFrame) -> None:
+        """Encoder thread: pop newest frame, encode once, publish to slot."""
+        import cv2  # deferred so importing this module stays cheap
+
+        frame_queue = frame_queues[camera_role]
+
+        preview_size = (Config.PREVIEW_WIDTH, Config.PREVIEW_HEIGHT)
+
+        while True:
+            frame = frame_queue.get()
+
+            # Latest-only policy: if the producer is ahead of the encoder,
+            # drain to the newest frame so latency stays bounded and we
+            # never spend encode time on frames no viewer will see in time
+            while True:
+                try:
+                    frame = frame_queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            # Defensive: never let a bad item kill the encoder thread —
+            # its death would freeze this camera's preview for the
+            # process lifetime
+            if frame is None:
+                continue
+
+            # The processing service queues pre-encoded JPEG bytes;
+            # publish them as-is. Raw BGR arrays are still handled for
+            # any producer that hasn't switched to bytes.
+            if isinstance(frame, bytes):
+                slot.publish(frame)
+                continue
+
+            # Downscale before encoding — preview quality is sufficient for
+            # the dashboard and encode cost scales with pixel count
+            if (frame.shape[1], frame.shape[0]) != preview_size:
+                frame = cv2.resize(frame, preview_size, interpolation=cv2.INTER_AREA)
+
+            try:
+                slot.publish(encode_jpeg(frame, quality=85))
+            except RuntimeError:
+                logger.warning("Encode failed for %s", camera_role)
@@ -7,13 +7,15 @@ Manages background processing threads, vehicle tracking, and WebSocket events.
 
 from __future__ import annotations
 
+import logging
 import os
 import queue
 import threading
+import time
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from datetime import datetime
 from enum import Enum
-from typing import Dict, List, Optional, Set, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any
 
 import cv2
 import numpy as np
@@ -24,8 +26,13 @@ from app.config import Config
 from app.models import SessionData, VehicleEvent
 from app.services.video_processor import VideoProcessor
 from app.services.firebase_service import FirebaseService
-from app.state import frame_queues
-from app.utils.math_utils import calculate_line_signed_distance
+from app.state import SPSCRing, frame_queues, session_subscribers
+from app.utils.jpeg import encode_jpeg
+from app.utils.math_utils import HAVE_NUMBA, line_signed_distances
+
+# Lazy %s formatting keeps disabled levels down to an isEnabledFor
+# check — these calls sit on the per-frame/per-interval hot paths
+logger = logging.getLogger(__name__)
 
 
 # =============================================================================
@@ -58,7 +65,10 @@ class ProcessingConfig:
     """Configuration constants for video processing."""
     # Frame processing
     PROGRESS_UPDATE_INTERVAL: int = 10      # Emit progress every N frames
+    PROGRESS_EMIT_MIN_NS: int = 250_000_000  # Wall-time floor between progress-only emits
     STREAM_FRAME_INTERVAL: int = 2          # Stream every Nth frame
+    WRITE_QUEUE_DEPTH: int = 8              # Frames buffered ahead of the writer
+    WRITE_RING_SIZE: int = 16               # Preallocated frame buffers (> queue depth + in-flight)
     
     # Tracking thresholds
     TRACK_THRESH: float = 0.25
@@ -88,16 +98,54 @@ processing_jobs: Dict[str, Dict[str, ProcessingJob]] = {}
 
 @dataclass
 class TrackingState:
-    """Maintains state for vehicle tracking across frames."""
-    track_classes: Dict[int, int] = field(default_factory=dict)
-    track_distances: Dict[int, Tuple[float, bool]] = field(default_factory=dict)
-    counted_ids: Set[int] = field(default_factory=set)
-    
+    """Maintains state for vehicle tracking across frames.
+
+    State lives in flat arrays indexed directly by ByteTrack id —
+    ByteTrack assigns small monotonically increasing integers, so a
+    whole detection batch reads its previous state with one gather and
+    writes it back with one scatter, no per-id dict hashing and no
+    pruning pass. Memory is bounded by the highest id seen (a few bytes
+    per id), doubling from MAX_IDS only on very long sessions.
+    """
+    MAX_IDS = 4096  # initial capacity; grows by doubling on overflow
+
+    capacity: int = MAX_IDS
+    track_classes: np.ndarray = field(init=False, repr=False)
+    track_distances: np.ndarray = field(init=False, repr=False)
+    track_within: np.ndarray = field(init=False, repr=False)
+    counted: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.track_classes = np.full(self.capacity, -1, dtype=np.int16)
+        self.track_distances = np.full(self.capacity, np.nan, dtype=np.float32)
+        self.track_within = np.zeros(self.capacity, dtype=bool)
+        self.counted = np.zeros(self.capacity, dtype=bool)
+        # Raw detections from the last frame that ran inference — re-fed
+        # to the tracker on frames skipped by DETECT_EVERY
+        self.last_detections: Optional[sv.Detections] = None
+
+    def ensure_capacity(self, max_id: int) -> None:
+        """Double the arrays until max_id fits."""
+        if max_id < self.capacity:
+            return
+        new_cap = self.capacity
+        while new_cap <= max_id:
+            new_cap *= 2
+        for name, fill in (('track_classes', -1), ('track_distances', np.nan),
+                           ('track_within', False), ('counted', False)):
+            old = getattr(self, name)
+            grown = np.full(new_cap, fill, dtype=old.dtype)
+            grown[:self.capacity] = old
+            setattr(self, name, grown)
+        self.capacity = new_cap
+
     def reset(self):
-        """Clear all tracking state."""
-        self.track_classes.clear()
-        self.track_distances.clear()
-        self.counted_ids.clear()
+        """Clear all tracking state (capacity is retained)."""
+        self.track_classes.fill(-1)
+        self.track_distances.fill(np.nan)
+        self.track_within.fill(False)
+        self.counted.fill(False)
+        self.last_detections = None
 
 
 @dataclass
@@ -117,34 +165,76 @@ class ProcessingJob:
     is_live_stream: bool = False
     should_stop: bool = False
     frames_processed: int = 0
-    # Firebase batching state
-    last_firebase_save_time: datetime = field(default_factory=datetime.now)
+    # Already-open capture handed over from stream configuration, so the
+    # pipeline skips a second RTSP handshake (consumed once, then None)
+    initial_cap: Optional[object] = field(default=None, repr=False)
+    # Firebase batching state. Monotonic nanoseconds, not datetime.now():
+    # the elapsed-interval check runs on the per-frame update path, and
+    # monotonic_ns is a cheap clock read immune to wall-clock steps.
+    last_firebase_save_ns: int = field(default_factory=time.monotonic_ns)
+    last_progress_emit_ns: int = 0
     last_event_count_saved: int = 0
     
     def to_dict(self) -> dict:
         """Convert job to dictionary for serialization."""
-        return {
+        payload = self._status_template.copy()
+        payload['status'] = self.status
+        payload['progress'] = self.progress
+        payload['error'] = self.error
+        payload['frames_processed'] = self.frames_processed
+        return payload
+    
+    def stop(self) -> None:
+        """Signal the job to stop processing."""
+        self.should_stop = True
+
+    def __post_init__(self):
+        # Line geometry is immutable for the job's lifetime — precompute
+        # the int endpoints and ax + by + c = 0 coefficients once instead
+        # of re-deriving them every frame
+        x1 = int(self.line_points[0][0])
+        y1 = int(self.line_points[0][1])
+        x2 = int(self.line_points[1][0])
+        y2 = int(self.line_points[1][1])
+        self.line_points_int: Tuple[Tuple[int, int], Tuple[int, int]] = ((x1, y1), (x2, y2))
+
+        dx = x2 - x1
+        dy = y2 - y1
+        a = y2 - y1
+        b = x1 - x2
+        c = x2 * y1 - x1 * y2
+        denom = (a * a + b * b) ** 0.5
+        line_len_sq = dx * dx + dy * dy
+        # (a, b, c, denom, dx, dy, line_len_sq)
+        self.line_coeffs = (a, b, c, denom, dx, dy, line_len_sq)
+
+        # Fully reduced constants for the per-frame distance fallback:
+        # dist = na*cx + nb*cy + nc and the projection parameter become
+        # pure multiply-adds, with the divisions folded in here once
+        if denom > 0:
+            self.line_coeffs_norm = (
+                a / denom, b / denom, c / denom,
+                dx / line_len_sq, dy / line_len_sq
+            )
+        else:
+            self.line_coeffs_norm = None
+
+        # Immutable emit-payload pieces, copied instead of rebuilt on
+        # each of the hundreds of per-video status/progress emits
+        self.base_payload = {
+            'session_id': self.session_id,
+            'camera_role': self.camera_role,
+        }
+        self._status_template = {
             'session_id': self.session_id,
-            'status': self.status,
-            'progress': self.progress,
-            'error': self.error,
             'location': self.location,
             'camera_role': self.camera_role,
             'is_live_stream': self.is_live_stream,
-            'frames_processed': self.frames_processed
         }
-    
-    def stop(self) -> None:
-        """Signal the job to stop processing."""
-        self.should_stop = True
-    
-    @property
-    def line_points_int(self) -> Tuple[Tuple[int, int], Tuple[int, int]]:
-        """Get line points as integer tuples."""
-        return (
-            (int(self.line_points[0][0]), int(self.line_points[0][1])),
-            (int(self.line_points[1][0]), int(self.line_points[1][1]))
-        )
+
+        # Epoch-seconds base for event timestamps — per-crossing stamps
+        # are then one float add instead of datetime + timedelta objects
+        self.video_start_ts = self.video_start_time.timestamp()
 
 
 # =============================================================================
@@ -158,7 +248,8 @@ def start_processing(
     location: str,
     video_start_time: datetime = None,
     camera_role: str = CameraRole.ENTRY.value,
-    is_live_stream: bool = False
+    is_live_stream: bool = False,
+    existing_cap=None
 ) -> ProcessingJob:
     """
     Start video processing in a background thread.
@@ -171,7 +262,9 @@ def start_processing(
         video_start_time: Timestamp for the video start
         camera_role: 'ENTRY' or 'EXIT' camera designation
         is_live_stream: Whether the source is a live stream (RTSP/HTTP)
-        
+        existing_cap: Already-open cv2.VideoCapture to reuse (live
+            streams only); the pipeline opens the URL itself when absent
+
     Returns:
         ProcessingJob instance for tracking progress
     """
@@ -181,13 +274,13 @@ def start_processing(
         
         # Signal stop if it's still running
         if existing_job.status == ProcessingStatus.PROCESSING.value:
-            print(f"Stopping existing thread for {camera_role} before restart...")
+            logger.info("Stopping existing thread for %s before restart...", camera_role)
             existing_job.stop()
             
             # Wait for the thread to actually finish (prevent queue conflict)
             if existing_job.thread and existing_job.thread.is_alive():
                 existing_job.thread.join(timeout=5.0)
-                print(f"Existing thread for {camera_role} terminated.")
+                logger.info("Existing thread for %s terminated.", camera_role)
 
     # Clear stale frames from queue
     _clear_frame_queue(camera_role)
@@ -204,7 +297,8 @@ def start_processing(
         location=location,
         camera_role=camera_role,
         video_start_time=video_start_time or datetime.now(),
-        is_live_stream=is_live_stream
+        is_live_stream=is_live_stream,
+        initial_cap=existing_cap if is_live_stream else None
     )
     
     # Store job in global registry
@@ -285,6 +379,74 @@ def get_job_status(session_id: str) -> Optional[Dict[str, dict]]:
 # BACKGROUND PROCESSING
 # =============================================================================
 
+class _FramePrefetcher:
+    """Reads frames on a dedicated thread so decode overlaps inference.
+
+    cv2.VideoCapture.read releases the GIL while ffmpeg decodes, so a
+    separate reader thread lets frame N+1 decode while frame N runs
+    through the model. The bounded queue caps memory and provides
+    natural back-pressure when inference is the slower stage.
+    """
+
+    _SENTINEL = object()
+
+    def __init__(self, cap: cv2.VideoCapture, depth: int = 4):
+        self._cap = cap
+        self._queue: queue.Queue = queue.Queue(maxsize=depth)
+        self._stopped = False
+        self._owns_release = False
+        self._thread = threading.Thread(
+            target=self._reader, daemon=True, name="FramePrefetch"
+        )
+        self._thread.start()
+
+    def _reader(self) -> None:
+        try:
+            while not self._stopped:
+                ret, frame = self._cap.read()
+                if not ret:
+                    self._queue.put(self._SENTINEL)
+                    break
+                self._queue.put(frame)  # blocks when full (back-pressure)
+        finally:
+            # Release ownership is handed over by stop() when its join
+            # times out — release here so a late-exiting reader never
+            # leaves the capture open (and the caller never frees it
+            # while we might still be inside cap.read())
+            if self._owns_release:
+                self._cap.release()
+
+    def read(self):
+        """Mirror cv2.VideoCapture.read(): returns (ret, frame)."""
+        frame = self._queue.get()
+        if frame is self._SENTINEL:
+            return False, None
+        return True, frame
+
+    def stop(self) -> bool:
+        """Signal the reader to exit and wait for it to finish.
+
+        Returns True once the reader thread has exited, meaning the
+        caller may safely release the capture. A reader stalled inside
+        cap.read() (e.g. a hung network stream) can outlive the wait;
+        releasing the capture mid-read crashes the decoder, so in that
+        case ownership of the release transfers to the reader thread
+        and False is returned — the caller must not touch the capture.
+        """
+        self._stopped = True
+        deadline = time.monotonic() + 2.0
+        while self._thread.is_alive() and time.monotonic() < deadline:
+            # Unblock the reader if it is parked on a full queue
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            self._thread.join(timeout=0.1)
+        if self._thread.is_alive():
+            self._owns_release = True
+            return False
+        return True
+
 def _run_processing_job(job: ProcessingJob) -> None:
     """
     Background thread function that processes video and emits events.
@@ -310,9 +472,12 @@ def _run_processing_job(job: ProcessingJob) -> None:
         else:
             _process_video(processor, firebase, job, session_data)
         
-        # Save final results with all events
+        # Save final results with all events (after draining any async
+        # periodic saves so the final write is last-writer)
+        firebase.flush()
         firebase.save_session(session_data, update_events=True, camera_role=job.camera_role)
-        print(f"[{job.camera_role}] Final save: {len(session_data.events)} total events saved to Firebase")
+        logger.info("[%s] Final save: %d total events saved to Firebase",
+                    job.camera_role, len(session_data.events))
         
         # Mark complete (or stopped for live streams)
         if job.should_stop:
@@ -329,7 +494,7 @@ def _run_processing_job(job: ProcessingJob) -> None:
         job.error = str(e)
         _emit_status_update(job)
         _emit_error(job, str(e))
-        print(f"Processing error for {job.camera_role}: {e}")
+        logger.exception("Processing error for %s", job.camera_role)
 
 
 def _process_video(
@@ -351,19 +516,14 @@ def _process_video(
         Path to the processed output video
     """
     # Initialize video capture
-    cap = cv2.VideoCapture(job.video_path)
+    cap = _open_video_capture(job.video_path)
     # fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
     fps = 30.0
     total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    
+
     # Setup video writer
     output_path = _create_video_writer(job, cap, fps)
-    writer = cv2.VideoWriter(
-        output_path,
-        cv2.VideoWriter_fourcc(*"mp4v"),
-        fps,
-        (Config.FRAME_WIDTH, Config.FRAME_HEIGHT)
-    )
+    writer = _open_video_writer(output_path, fps)
     
     # Initialize tracker and annotators
     tracker = _create_tracker(fps)
@@ -376,10 +536,42 @@ def _process_video(
     frame_queue = frame_queues.get(job.camera_role)
     frame_idx = 0
     last_event_count = 0
-    
+
+    # Decode on a separate thread so it overlaps inference
+    prefetcher = _FramePrefetcher(cap)
+
+    # Encode/write on a consumer thread: VideoWriter.write releases the
+    # GIL during H.264 encode, so it overlaps the next model call. The
+    # bounded queue caps memory and back-pressures the producer when
+    # encode is the slower stage.
+    write_q: queue.Queue = queue.Queue(maxsize=PROC_CONFIG.WRITE_QUEUE_DEPTH)
+
+    # Ring of preallocated frame buffers: the resize writes into a ring
+    # slot and annotation mutates it in place, so steady-state processing
+    # does zero full-frame allocations. The ring outsizes the write queue
+    # enough that a slot is always drained before it comes up for reuse.
+    ring = [
+        np.empty((Config.FRAME_HEIGHT, Config.FRAME_WIDTH, 3), np.uint8)
+        for _ in range(PROC_CONFIG.WRITE_RING_SIZE)
+    ]
+
+    def _writer_loop() -> None:
+        while True:
+            item = write_q.get()
+            if item is None:
+                break
+            out_frame, out_idx = item
+            writer.write(out_frame)
+            _stream_frame(frame_queue, out_frame, out_idx)
+
+    writer_thread = threading.Thread(
+        target=_writer_loop, daemon=True, name=f"FrameWriter-{job.camera_role}"
+    )
+    writer_thread.start()
+
     try:
         while True:
-            ret, frame = cap.read()
+            ret, frame = prefetcher.read()
             if not ret:
                 break
             
@@ -393,15 +585,13 @@ def _process_video(
                 job=job,
                 session_data=session_data,
                 frame_idx=frame_idx,
-                fps=fps
+                fps=fps,
+                out=ring[frame_idx % PROC_CONFIG.WRITE_RING_SIZE]
             )
-            
-            # Write to output
-            writer.write(annotated_frame)
-            
-            # Stream frame for live display
-            _stream_frame(frame_queue, annotated_frame, frame_idx)
-            
+
+            # Hand off to the writer thread (write + live-stream fan-out)
+            write_q.put((annotated_frame, frame_idx))
+
             # Periodic updates
             if frame_idx % PROC_CONFIG.PROGRESS_UPDATE_INTERVAL == 0:
                 last_event_count = _handle_periodic_updates(
@@ -414,11 +604,20 @@ def _process_video(
                 )
             
             frame_idx += 1
-            
+
     finally:
-        cap.release()
+        if prefetcher.stop():
+            cap.release()
+        else:
+            logger.warning(
+                "Frame prefetcher still reading after stop timeout; "
+                "capture release deferred to the reader thread"
+            )
+        # Drain the writer before releasing so queued frames land on disk
+        write_q.put(None)
+        writer_thread.join(timeout=10.0)
         writer.release()
-    
+
     return output_path
 
 
@@ -443,8 +642,6 @@ def _process_live_stream(
         job: Current processing job
         session_data: Session data container
     """
-    import time
-    
     cap = None
     retry_count = 0
     max_retries = Config.LIVE_STREAM_RETRY_ATTEMPTS
@@ -459,9 +656,27 @@ def _process_live_stream(
     frame_queue = frame_queues.get(job.camera_role)
     frame_idx = 0
     last_event_count = 0
-    
-    print(f"Starting live stream processing for {job.camera_role}: {job.video_path}")
-    
+
+    # Adopt the capture opened during stream configuration when one was
+    # handed over — skips the second RTSP handshake (DESCRIBE/SETUP plus
+    # the wait for the first IDR frame, often seconds on real cameras)
+    if job.initial_cap is not None:
+        handed_over = job.initial_cap
+        job.initial_cap = None
+        if handed_over.isOpened():
+            cap = handed_over
+            actual_fps = cap.get(cv2.CAP_PROP_FPS)
+            if actual_fps > 0:
+                fps = actual_fps
+                tracker = _create_tracker(fps)
+            logger.info("Reusing configured stream capture for %s at %.1f FPS",
+                        job.camera_role, fps)
+        else:
+            handed_over.release()
+
+    logger.info("Starting live stream processing for %s: %s",
+                job.camera_role, job.video_path)
+
     try:
         while not job.should_stop:
             # Connect/reconnect to stream
@@ -470,11 +685,20 @@ def _process_live_stream(
                     raise ConnectionError(f"Lost connection to stream after {max_retries} retries")
                 
                 if retry_count > 0:
-                    print(f"Reconnecting to stream (attempt {retry_count + 1}/{max_retries})...")
+                    # First retry at WARNING, the rest at DEBUG — one line
+                    # flags the outage without flooding the log while a
+                    # stream stays down
+                    logger.log(
+                        logging.WARNING if retry_count == 1 else logging.DEBUG,
+                        "Reconnecting to stream (attempt %d/%d)...",
+                        retry_count + 1, max_retries
+                    )
                     _emit_status_update(job)  # Notify client of reconnection attempt
                     time.sleep(retry_delay)
                 
-                cap = cv2.VideoCapture(job.video_path)
+                # Same hardware-accelerated open as the file path — RTSP
+                # H.264/HEVC decode is the dominant CPU cost per stream
+                cap = _open_video_capture(job.video_path)
                 cap.set(cv2.CAP_PROP_BUFFERSIZE, Config.LIVE_STREAM_BUFFER_SIZE)
                 
                 if not cap.isOpened():
@@ -489,7 +713,7 @@ def _process_live_stream(
                     tracker = _create_tracker(fps)
                 
                 retry_count = 0
-                print(f"Connected to live stream at {fps:.1f} FPS")
+                logger.info("Connected to live stream at %.1f FPS", fps)
             
             # Read frame
             ret, frame = cap.read()
@@ -536,7 +760,8 @@ def _process_live_stream(
     finally:
         if cap:
             cap.release()
-        print(f"Live stream processing stopped for {job.camera_role}. Frames processed: {frame_idx}")
+        logger.info("Live stream processing stopped for %s. Frames processed: %d",
+                    job.camera_role, frame_idx)
 
 
 def _handle_live_stream_updates(
@@ -552,54 +777,38 @@ def _handle_live_stream_updates(
     Returns:
         Updated event count
     """
-    # For live streams, emit a "live" status instead of progress percentage
-    socketio.emit(
-        'processing_progress',
-        {
-            'session_id': job.session_id,
-            'progress': -1,  # -1 indicates live stream
-            'camera_role': job.camera_role,
-            'frames_processed': frame_idx,
-            'is_live': True
-        },
-        room=job.session_id,
-        namespace='/'
-    )
-    
-    # Check for new events and emit them immediately via WebSocket
+    # For live streams the tick carries a -1 progress marker plus any
+    # new events and statistics in the same message
     current_count = len(session_data.events)
-    if current_count > last_event_count:
-        # Emit new events to WebSocket (real-time UI updates)
-        for event in session_data.events[last_event_count:]:
-            _emit_vehicle_event(job, event)
-        
-        # Emit updated statistics to WebSocket
-        _emit_statistics_update(job, session_data.get_statistics())
-    
+    new_events = session_data.events[last_event_count:] if current_count > last_event_count else []
+    _emit_processing_tick(job, session_data, new_events,
+                          frames_processed=frame_idx, is_live=True)
+
     # Batched Firebase persistence (time-based)
-    time_since_last_save = (datetime.now() - job.last_firebase_save_time).total_seconds()
-    
+    elapsed_ns = time.monotonic_ns() - job.last_firebase_save_ns
+
     # Save to Firebase if interval elapsed
-    if time_since_last_save >= Config.FIREBASE_LIVE_STREAM_INTERVAL:
+    if elapsed_ns >= Config.FIREBASE_LIVE_STREAM_INTERVAL * 1_000_000_000:
         if current_count > job.last_event_count_saved:
             # Save session with batched events and updated statistics
-            firebase.save_session(
+            firebase.save_session_async(
                 session_data,
                 update_events=True,  # Include all events in batch
                 camera_role=job.camera_role
             )
+            logger.debug("[%s] Live stream: batched %d events to Firebase",
+                         job.camera_role, current_count - job.last_event_count_saved)
             job.last_event_count_saved = current_count
-            print(f"[{job.camera_role}] Live stream: Batched {current_count - job.last_event_count_saved} events to Firebase")
         else:
             # Update statistics only (no new events)
-            firebase.save_session(
+            firebase.save_session_async(
                 session_data,
                 update_events=False,
                 camera_role=job.camera_role
             )
-        
-        job.last_firebase_save_time = datetime.now()
-    
+
+        job.last_firebase_save_ns = time.monotonic_ns()
+
     return current_count
 
 
@@ -612,18 +821,43 @@ def _process_single_frame(
     job: ProcessingJob,
     session_data: SessionData,
     frame_idx: int,
-    fps: float
+    fps: float,
+    out: Optional[np.ndarray] = None
 ) -> np.ndarray:
     """
     Process a single video frame: detect, track, annotate, count.
-    
+
+    When `out` is given the resize lands in that preallocated buffer
+    (and annotation mutates it in place), so the caller's ring buffer is
+    reused instead of allocating a full frame per call.
+
     Returns:
         Annotated frame ready for output/streaming
     """
-    resized = cv2.resize(frame, (Config.FRAME_WIDTH, Config.FRAME_HEIGHT))
-    
-    # YOLO accepts BGR numpy arrays directly — no colour conversion needed
-    detections = processor.detect(resized)
+    h, w = frame.shape[:2]
+    if w == Config.FRAME_WIDTH and h == Config.FRAME_HEIGHT:
+        # Source already at model resolution (common for RTSP cameras
+        # tuned to it) — annotate the decoded frame in place and skip a
+        # full-frame resize copy
+        resized = frame
+    elif out is not None:
+        resized = cv2.resize(frame, (Config.FRAME_WIDTH, Config.FRAME_HEIGHT), dst=out)
+    else:
+        resized = cv2.resize(frame, (Config.FRAME_WIDTH, Config.FRAME_HEIGHT))
+
+    # YOLO accepts BGR numpy arrays directly — no colour conversion needed.
+    # With DETECT_EVERY > 1, skipped frames re-feed the previous frame's
+    # raw detections: ByteTrack re-matches them against its Kalman
+    # predictions, so tracks stay active with at most one frame of box
+    # staleness instead of being marked lost, and line-crossing checks
+    # still run on every frame.
+    if frame_idx % Config.DETECT_EVERY == 0:
+        detections = processor.detect(resized)
+        tracking.last_detections = detections
+    elif tracking.last_detections is not None:
+        detections = tracking.last_detections
+    else:
+        detections = sv.Detections.empty()
     detections = tracker.update_with_detections(detections)
     
     # Build labels
@@ -672,17 +906,27 @@ def _create_annotators() -> dict:
 
 
 def _build_detection_labels(detections: sv.Detections, processor: VideoProcessor) -> List[str]:
-    """Build label strings for detected objects."""
+    """Build label strings for detected objects.
+
+    .tolist() unboxes each array to native Python scalars in one C call;
+    iterating the ndarrays directly boxes a numpy scalar per element.
+    """
     if detections.tracker_id is None:
         return []
-    
+
+    # One gather resolves every class name (invalid ids hit the trailing
+    # 'Unknown' sentinel slot) instead of a method call per detection
+    cids = detections.class_id
+    safe = np.where((cids >= 0) & (cids < len(processor.class_names)),
+                    cids, len(processor.class_names))
+    names = processor.label_names[safe].tolist()
+
+    tids = detections.tracker_id.tolist()
+    confs = detections.confidence.tolist()
+
     return [
-        f"#{tid} {processor.get_class_name(cid)} {conf:.2f}"
-        for tid, cid, conf in zip(
-            detections.tracker_id,
-            detections.class_id,
-            detections.confidence
-        )
+        f"#{tid} {name} {conf:.2f}"
+        for tid, name, conf in zip(tids, names, confs)
     ]
 
 
@@ -693,20 +937,25 @@ def _annotate_frame(
     annotators: dict,
     job: ProcessingJob
 ) -> np.ndarray:
-    """Apply all annotations to a frame."""
-    annotated = frame.copy()
-    
+    """Apply all annotations to a frame.
+
+    Mutates the input in place: the caller's resized frame is not used
+    again after annotation, so the previous full-frame .copy() (~900KB
+    memcpy per frame at processing resolution) bought nothing.
+    """
     # Draw tracking traces, bounding boxes, and labels
-    annotated = annotators['trace'].annotate(annotated, detections)
+    annotated = annotators['trace'].annotate(frame, detections)
     annotated = annotators['bbox'].annotate(annotated, detections)
     
     if labels:
         annotated = annotators['label'].annotate(annotated, detections, labels)
     
-    # Draw counting line
+    # Draw the counting line from the precomputed integer endpoints —
+    # cv2.line touches only the ~line-length pixels, where a boolean-mask
+    # blit would scan the full frame every time
     pt1, pt2 = job.line_points_int
     cv2.line(annotated, pt1, pt2, PROC_CONFIG.LINE_COLOR, PROC_CONFIG.LINE_THICKNESS)
-    
+
     return annotated
 
 
@@ -721,55 +970,75 @@ def _detect_line_crossings(
 ) -> None:
     """
     Detect vehicles crossing the counting line and create events.
+
+    Centroids, signed distances and the crossing predicate are computed
+    for all detections in one NumPy pass; per-track state is read and
+    written with array gathers/scatters, so Python-level iteration is
+    limited to the (rare) crossings themselves.
     """
-    if detections.tracker_id is None:
+    tracker_ids = detections.tracker_id
+    if tracker_ids is None or len(tracker_ids) == 0:
         return
-    
-    pt1, pt2 = job.line_points_int
-    
-    for tracker_id, class_id, xyxy in zip(
-        detections.tracker_id,
-        detections.class_id,
-        detections.xyxy
-    ):
-        if tracker_id is None:
+
+    (x1, y1), (x2, y2) = job.line_points_int
+    a, b, c, denom, dx, dy, line_len_sq = job.line_coeffs
+    if line_len_sq == 0:
+        return
+
+    xyxy = detections.xyxy
+    cx = (xyxy[:, 0] + xyxy[:, 2]) * 0.5
+    cy = (xyxy[:, 1] + xyxy[:, 3]) * 0.5
+
+    if HAVE_NUMBA:
+        # Fused JIT kernel: one loop, no intermediate arrays
+        dist, is_within = line_signed_distances(
+            np.ascontiguousarray(cx, dtype=np.float64),
+            np.ascontiguousarray(cy, dtype=np.float64),
+            float(x1), float(y1), float(x2), float(y2)
+        )
+    else:
+        # Pre-reduced per-job constants: two multiply-adds per centroid,
+        # no division in the per-frame path
+        na, nb, nc, ndx, ndy = job.line_coeffs_norm
+        dist = na * cx + nb * cy + nc
+        t = (cx - x1) * ndx + (cy - y1) * ndy
+        is_within = (t >= -0.1) & (t <= 1.1)
+
+    ids = np.asarray(tracker_ids, dtype=np.intp)
+    tracking.ensure_capacity(int(ids.max()))
+
+    # Previous per-track state: one gather each (NaN for unseen tracks —
+    # every comparison against NaN is False, so new tracks can't "cross")
+    prev_dist = tracking.track_distances[ids]
+    prev_within = tracking.track_within[ids]
+
+    # Crossing: sign change + close to line + within segment bounds
+    crossed = (
+        (prev_dist * dist < 0)
+        & (np.minimum(np.abs(prev_dist), np.abs(dist)) < PROC_CONFIG.CROSSING_DISTANCE_THRESHOLD)
+        & (is_within | prev_within)
+    )
+
+    # Scatter current state back in three vectorized writes. Stale ids
+    # just sit in their slots — ByteTrack never reuses an id within a
+    # session, so no pruning pass is needed.
+    tracking.track_classes[ids] = detections.class_id.astype(np.int16)
+    tracking.track_distances[ids] = dist
+    tracking.track_within[ids] = is_within
+
+    for i in np.flatnonzero(crossed):
+        tid = int(ids[i])
+        if tracking.counted[tid]:
             continue
-        
-        # Calculate centroid
-        cx = int((xyxy[0] + xyxy[2]) / 2)
-        cy = int((xyxy[1] + xyxy[3]) / 2)
-        
-        # Get signed distance to line
-        dist, is_within = calculate_line_signed_distance(pt1, pt2, (cx, cy))
-        
-        # Update tracking state
-        tracking.track_classes[tracker_id] = int(class_id)
-        prev_data = tracking.track_distances.get(tracker_id)
-        
-        # Check for line crossing
-        if prev_data is not None and tracker_id not in tracking.counted_ids:
-            prev_dist, prev_within = prev_data
-            
-            # Crossing detected: sign change + close to line + within bounds
-            crossed = (
-                prev_dist * dist < 0 and
-                min(abs(prev_dist), abs(dist)) < PROC_CONFIG.CROSSING_DISTANCE_THRESHOLD and
-                (is_within or prev_within)
-            )
-            
-            if crossed:
-                _create_crossing_event(
-                    tracker_id=tracker_id,
-                    processor=processor,
-                    tracking=tracking,
-                    job=job,
-                    session_data=session_data,
-                    frame_idx=frame_idx,
-                    fps=fps
-                )
-        
-        # Store current distance
-        tracking.track_distances[tracker_id] = (dist, is_within)
+        _create_crossing_event(
+            tracker_id=tid,
+            processor=processor,
+            tracking=tracking,
+            job=job,
+            session_data=session_data,
+            frame_idx=frame_idx,
+            fps=fps
+        )
 
 
 def _create_crossing_event(
@@ -782,27 +1051,27 @@ def _create_crossing_event(
     fps: float
 ) -> None:
     """Create and record a vehicle crossing event."""
-    class_id = tracking.track_classes[tracker_id]
+    class_id = int(tracking.track_classes[tracker_id])
     vehicle_type = processor.get_class_name(class_id)
     capacity = processor.get_vehicle_capacity(vehicle_type)
     
     # Direction based on camera role
     direction = 'OUT' if job.camera_role == CameraRole.EXIT.value else 'IN'
     
-    # Calculate event timestamp
-    time_offset = timedelta(seconds=frame_idx / fps)
-    event_time = job.video_start_time + time_offset
-    
+    # Event timestamp: epoch seconds, one float add off the precomputed
+    # job start — formatted to ISO only at serialization time
+    event_ts = job.video_start_ts + frame_idx / fps
+
     event = VehicleEvent(
         vehicle_type=vehicle_type,
         direction=direction,
-        timestamp=event_time,
+        timestamp=event_ts,
         seats_min=capacity['min'],
         seats_max=capacity['max']
     )
     
     session_data.add_event(event)
-    tracking.counted_ids.add(tracker_id)
+    tracking.counted[tracker_id] = True
 
 
 # =============================================================================
@@ -810,21 +1079,58 @@ def _create_crossing_event(
 # =============================================================================
 
 def _clear_frame_queue(camera_role: str) -> None:
-    """Clear any stale frames from the streaming queue."""
+    """Clear any stale frames from the streaming ring."""
     frame_queue = frame_queues.get(camera_role)
     if not frame_queue:
         return
-    
-    count = 0
-    while not frame_queue.empty():
-        try:
-            frame_queue.get_nowait()
-            count += 1
-        except queue.Empty:
-            break
-    
+
+    count = frame_queue.clear()
     if count > 0:
-        print(f"Cleared {count} stale frames from {camera_role} queue")
+        logger.debug("Cleared %d stale frames from %s queue", count, camera_role)
+
+
+def _open_video_capture(video_path: str) -> cv2.VideoCapture:
+    """Open a file capture, preferring hardware-accelerated decode.
+
+    VIDEO_ACCELERATION_ANY routes H.264/HEVC decode through NVDEC/VAAPI
+    where available; plain software open is the fallback. Buffer size is
+    pinned to 1 — the prefetch thread does the read-ahead.
+    """
+    try:
+        cap = cv2.VideoCapture(
+            video_path, cv2.CAP_FFMPEG,
+            [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+        )
+        if cap.isOpened():
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            return cap
+        cap.release()
+    except (cv2.error, AttributeError):
+        pass
+    cap = cv2.VideoCapture(video_path)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+
+def _open_video_writer(output_path: str, fps: float) -> cv2.VideoWriter:
+    """Open the output writer, preferring hardware-accelerated H.264.
+
+    Tries avc1 with NVENC/VAAPI offload first; falls back to the
+    software mp4v encoder used previously when the accelerated path is
+    unavailable (older OpenCV builds or no encode hardware).
+    """
+    size = (Config.FRAME_WIDTH, Config.FRAME_HEIGHT)
+    try:
+        writer = cv2.VideoWriter(
+            output_path, cv2.VideoWriter_fourcc(*'avc1'), fps, size,
+            params=[cv2.VIDEOWRITER_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+        )
+        if writer.isOpened():
+            return writer
+        writer.release()
+    except (cv2.error, AttributeError, TypeError):
+        pass
+    return cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, size)
 
 
 def _create_video_writer(job: ProcessingJob, cap: cv2.VideoCapture, fps: float) -> str:
@@ -833,16 +1139,49 @@ def _create_video_writer(job: ProcessingJob, cap: cv2.VideoCapture, fps: float)
     return os.path.join(Config.OUTPUT_FOLDER, output_filename)
 
 
-def _stream_frame(frame_queue: Optional[queue.Queue], frame: np.ndarray, frame_idx: int) -> None:
-    """Stream frame to queue for live display (non-blocking)."""
+# Reusable preview downscale buffers, one per stream queue. Each queue
+# has a single producer thread, and encode_jpeg consumes the buffer
+# before returning, so reuse across calls is safe.
+_preview_bufs: Dict[int, np.ndarray] = {}
+
+
+def _stream_frame(frame_queue: Optional['SPSCRing'], frame: np.ndarray, frame_idx: int) -> None:
+    """Stream frame to queue as JPEG bytes for live display (non-blocking).
+
+    Encoding on the producer side means one encode shared by every viewer
+    and ~30KB of JPEG queued per frame instead of a ~900KB BGR array.
+    """
     if frame_queue is None:
         return
-    
-    if frame_idx % PROC_CONFIG.STREAM_FRAME_INTERVAL != 0:
+
+    # Backpressure-adaptive stride: when the consumer lags and the ring
+    # fills up, widen the interval so encode CPU isn't spent on frames
+    # that put_nowait would drop anyway; drains back to the base stride
+    # as the consumer catches up
+    base = PROC_CONFIG.STREAM_FRAME_INTERVAL
+    fill = frame_queue.qsize() / frame_queue.maxsize
+    interval = max(base, int(base * (1.0 + 4.0 * fill)))
+    if frame_idx % interval != 0:
         return
-    
+
+    buf = _preview_bufs.get(id(frame_queue))
+    if buf is None:
+        buf = np.empty((Config.PREVIEW_HEIGHT, Config.PREVIEW_WIDTH, 3), np.uint8)
+        _preview_bufs[id(frame_queue)] = buf
+
+    preview = cv2.resize(
+        frame,
+        (Config.PREVIEW_WIDTH, Config.PREVIEW_HEIGHT),
+        dst=buf,
+        interpolation=cv2.INTER_AREA
+    )
+    try:
+        payload = encode_jpeg(preview, quality=85)
+    except RuntimeError:
+        return  # Skip frame on encoder failure
+
     try:
-        frame_queue.put_nowait(frame.copy())
+        frame_queue.put_nowait(payload)
     except queue.Full:
         pass  # Skip frame if queue is full
 
@@ -863,44 +1202,50 @@ def _handle_periodic_updates(
     """
     # Update progress
     progress = int((frame_idx / total_frames) * 100) if total_frames > 0 else 0
-    if progress != job.progress:
+    progress_changed = progress != job.progress
+    if progress_changed:
         job.progress = progress
-        _emit_progress_update(job)
-    
-    # Check for new events and emit them immediately via WebSocket
+
+    # One combined tick emit (progress + new events + statistics)
+    # instead of three separate serializations and WebSocket frames.
+    # Progress-only ticks additionally respect a wall-time floor so a
+    # short clip (where every few frames is another percent) can't fire
+    # a burst of emits; event-carrying ticks always go out.
     current_count = len(session_data.events)
-    if current_count > last_event_count:
-        # Emit new events to WebSocket (real-time UI updates)
-        for event in session_data.events[last_event_count:]:
-            _emit_vehicle_event(job, event)
-        
-        # Emit updated statistics to WebSocket
-        _emit_statistics_update(job, session_data.get_statistics())
-    
+    new_events = session_data.events[last_event_count:] if current_count > last_event_count else []
+    if new_events or progress_changed:
+        now_ns = time.monotonic_ns()
+        if new_events or now_ns - job.last_progress_emit_ns >= PROC_CONFIG.PROGRESS_EMIT_MIN_NS:
+            _emit_processing_tick(job, session_data, new_events)
+            job.last_progress_emit_ns = now_ns
+
     # Batched Firebase persistence (time-based)
-    time_since_last_save = (datetime.now() - job.last_firebase_save_time).total_seconds()
-    
+    elapsed_ns = time.monotonic_ns() - job.last_firebase_save_ns
+
     # Save to Firebase if interval elapsed AND there are new events or statistics
-    if time_since_last_save >= Config.FIREBASE_EVENT_BATCH_INTERVAL:
+    # (saves go through the executor so HTTPS round trips never block the
+    # frame loop; the final synchronous save still guarantees durability)
+    if elapsed_ns >= Config.FIREBASE_EVENT_BATCH_INTERVAL * 1_000_000_000:
         if current_count > job.last_event_count_saved:
             # Save session with batched events and updated statistics
-            firebase.save_session(
-                session_data, 
+            firebase.save_session_async(
+                session_data,
                 update_events=True,  # Include all events in batch
                 camera_role=job.camera_role
             )
-            job.last_firebase_save_time = datetime.now()
+            job.last_firebase_save_ns = time.monotonic_ns()
+            logger.debug("[%s] Batched %d events to Firebase",
+                         job.camera_role, current_count - job.last_event_count_saved)
             job.last_event_count_saved = current_count
-            print(f"[{job.camera_role}] Batched {current_count - job.last_event_count_saved} events to Firebase")
-        elif time_since_last_save >= Config.FIREBASE_STATISTICS_INTERVAL:
+        elif elapsed_ns >= Config.FIREBASE_STATISTICS_INTERVAL * 1_000_000_000:
             # Update statistics only (no new events)
-            firebase.save_session(
+            firebase.save_session_async(
                 session_data,
                 update_events=False,
                 camera_role=job.camera_role
             )
-            job.last_firebase_save_time = datetime.now()
-    
+            job.last_firebase_save_ns = time.monotonic_ns()
+
     return current_count
 
 
@@ -918,43 +1263,37 @@ def _emit_status_update(job: ProcessingJob) -> None:
     )
 
 
-def _emit_progress_update(job: ProcessingJob) -> None:
-    """Emit progress percentage update."""
-    socketio.emit(
-        'processing_progress',
-        {
-            'session_id': job.session_id,
-            'progress': job.progress,
-            'camera_role': job.camera_role
-        },
-        room=job.session_id,
-        namespace='/'
-    )
-
-
-def _emit_vehicle_event(job: ProcessingJob, event: VehicleEvent) -> None:
-    """Emit a new vehicle detection event."""
-    socketio.emit(
-        'vehicle_event',
-        {
-            'session_id': job.session_id,
-            'event': event.to_dict(),
-            'camera_role': job.camera_role
-        },
-        room=job.session_id,
-        namespace='/'
-    )
+def _emit_processing_tick(
+    job: ProcessingJob,
+    session_data: SessionData,
+    new_events: List[VehicleEvent],
+    frames_processed: Optional[int] = None,
+    is_live: bool = False
+) -> None:
+    """Emit one combined update: progress, new events and statistics.
 
+    Update ticks previously issued up to three emits (progress, events,
+    statistics) — three serializations and WebSocket frames. Events and
+    statistics are only included when there is something new. Tick
+    cadence (PROGRESS_UPDATE_INTERVAL frames) already sits well under
+    10 Hz, so no extra rate limiting is needed.
 
-def _emit_statistics_update(job: ProcessingJob, stats: dict) -> None:
-    """Emit updated session statistics."""
+    Skipped entirely when no client has joined this session's room —
+    headless runs then pay nothing for payload builds or broadcasts.
+    """
+    if not session_subscribers.get(job.session_id):
+        return
+    payload = job.base_payload.copy()
+    payload['progress'] = -1 if is_live else job.progress
+    if is_live:
+        payload['frames_processed'] = frames_processed
+        payload['is_live'] = True
+    if new_events:
+        payload['events'] = [event.to_dict() for event in new_events]
+        payload['statistics'] = session_data.get_statistics()
     socketio.emit(
-        'statistics_update',
-        {
-            'session_id': job.session_id,
-            'statistics': stats,
-            'camera_role': job.camera_role
-        },
+        'processing_tick',
+        payload,
         room=job.session_id,
         namespace='/'
     )
@@ -962,13 +1301,11 @@ def _emit_statistics_update(job: ProcessingJob, stats: dict) -> None:
 
 def _emit_processing_complete(job: ProcessingJob, final_stats: dict) -> None:
     """Emit processing completion event."""
+    payload = job.base_payload.copy()
+    payload['statistics'] = final_stats
     socketio.emit(
         'processing_complete',
-        {
-            'session_id': job.session_id,
-            'statistics': final_stats,
-            'camera_role': job.camera_role
-        },
+        payload,
         room=job.session_id,
         namespace='/'
     )
@@ -976,13 +1313,11 @@ def _emit_processing_complete(job: ProcessingJob, final_stats: dict) -> None:
 
 def _emit_error(job: ProcessingJob, error_message: str) -> None:
     """Emit processing error event."""
+    payload = job.base_payload.copy()
+    payload['error'] = error_message
     socketio.emit(
         'processing_error',
-        {
-            'session_id': job.session_id,
-            'error': error_message,
-            'camera_role': job.camera_role
-        },
+        payload,
         room=job.session_id,
         namespace='/'
     )
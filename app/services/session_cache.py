@@ -0,0 +1,128 @@
+"""
+Session Snapshot Cache Module
+
+Keeps an in-memory snapshot of each session's Firebase data so the polled
+dashboard API endpoints never block on a Firebase round trip (0.5-2s per
+call). A single daemon thread refreshes active sessions at the configured
+statistics interval, collapsing N concurrent client polls into one
+upstream fetch per session.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from app.config import Config
+from app.services.firebase_service import FirebaseService
+
+logger = logging.getLogger(__name__)
+
+# Sessions not read through get() for this long are dropped from the
+# refresh cycle — without it, every session a worker ever served keeps
+# costing one Firebase read per interval (and its snapshot's memory)
+# for the process lifetime. A later get() simply re-registers it.
+IDLE_EVICT_SECONDS = 600
+
+
+class SessionSnapshotCache:
+    """
+    Thread-safe singleton cache of {session_id: (fetched_at, data)}.
+
+    Sessions are registered on first access and refreshed in the background
+    every ``Config.FIREBASE_STATISTICS_INTERVAL`` seconds. Reads always
+    return the latest snapshot immediately; only the very first read of a
+    session pays the synchronous Firebase fetch.
+    """
+
+    _instance: Optional['SessionSnapshotCache'] = None
+    _init_lock = threading.Lock()
+
+    def __init__(self):
+        self._snapshots: Dict[str, Tuple[datetime, Optional[dict]]] = {}
+        # Monotonic time of the last get() per session, for idle eviction
+        self._last_access: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._firebase = FirebaseService()
+        self._refresh_interval = Config.FIREBASE_STATISTICS_INTERVAL
+
+        self._thread = threading.Thread(
+            target=self._refresh_loop, daemon=True, name="SessionSnapshotCache"
+        )
+        self._thread.start()
+
+    @classmethod
+    def get_instance(cls) -> 'SessionSnapshotCache':
+        if cls._instance is None:
+            with cls._init_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def get(self, session_id: str) -> Optional[dict]:
+        """
+        Return the cached session data, fetching synchronously only when the
+        session has never been seen before.
+        """
+        with self._lock:
+            self._last_access[session_id] = time.monotonic()
+            snapshot = self._snapshots.get(session_id)
+
+        if snapshot is not None:
+            return snapshot[1]
+
+        # First access: fetch now and register for background refresh
+        data = self._fetch(session_id)
+        with self._lock:
+            self._snapshots[session_id] = (datetime.now(), data)
+        return data
+
+    def get_with_version(self, session_id: str):
+        """
+        Return (data, version) where version changes whenever the snapshot
+        is refreshed — suitable for deriving HTTP ETags.
+        """
+        data = self.get(session_id)
+        with self._lock:
+            snapshot = self._snapshots.get(session_id)
+        version = int(snapshot[0].timestamp()) if snapshot else 0
+        return data, version
+
+    def invalidate(self, session_id: str) -> None:
+        """Drop a session from the cache (e.g., when a session is reset)."""
+        with self._lock:
+            self._snapshots.pop(session_id, None)
+            self._last_access.pop(session_id, None)
+
+    def _fetch(self, session_id: str) -> Optional[dict]:
+        try:
+            return self._firebase.get_session_data(session_id)
+        except Exception:
+            logger.exception("Fetch failed for %s", session_id)
+            return None
+
+    def _refresh_loop(self) -> None:
+        """Background thread: refresh active sessions, evict idle ones."""
+        while True:
+            time.sleep(self._refresh_interval)
+
+            cutoff = time.monotonic() - IDLE_EVICT_SECONDS
+            with self._lock:
+                idle = [
+                    sid for sid, last in self._last_access.items()
+                    if last < cutoff
+                ]
+                for sid in idle:
+                    self._snapshots.pop(sid, None)
+                    self._last_access.pop(sid, None)
+                session_ids = list(self._snapshots.keys())
+
+            if idle:
+                logger.debug("Evicted %d idle session snapshot(s)", len(idle))
+
+            for session_id in session_ids:
+                data = self._fetch(session_id)
+                if data is not None:
+                    with self._lock:
+                        self._snapshots[session_id] = (datetime.now(), data)
@@ -9,6 +9,7 @@ all camera threads via batched GPU inference, maximising throughput for
 
 from __future__ import annotations
 
+import logging
 import threading
 import time
 from dataclasses import dataclass, field
@@ -22,6 +23,8 @@ from ultralytics import YOLO
 
 from app.config import Config
 
+logger = logging.getLogger(__name__)
+
 
 # =============================================================================
 # CONSTANTS
@@ -71,6 +74,12 @@ class BatchInferenceEngine:
             device = 'cuda' if torch.cuda.is_available() else 'cpu'
             self._model.to(device)
 
+        # FP16 only applies to the PyTorch backend on CUDA; .engine
+        # precision is fixed when the engine is built
+        self._half = bool(
+            Config.USE_FP16 and model_path.endswith('.pt') and torch.cuda.is_available()
+        )
+
         self.max_batch_size = max_batch_size
         self.max_wait_ms = max_wait_ms
 
@@ -83,9 +92,9 @@ class BatchInferenceEngine:
             target=self._inference_loop, daemon=True, name="BatchInference"
         )
         self._thread.start()
-        print(
-            f"BatchInferenceEngine: model='{model_path}'  "
-            f"max_batch={max_batch_size}  max_wait={max_wait_ms}ms"
+        logger.info(
+            "BatchInferenceEngine: model='%s'  max_batch=%d  max_wait=%dms",
+            model_path, max_batch_size, max_wait_ms
         )
 
     # ---- singleton accessor ------------------------------------------------
@@ -158,13 +167,15 @@ class BatchInferenceEngine:
             frames = [r.frame for r in batch]
 
             try:
-                results = self._model.predict(frames, conf=threshold, verbose=False)
+                results = self._model.predict(
+                    frames, conf=threshold, half=self._half, verbose=False
+                )
                 for req, res in zip(batch, results):
                     req.result = sv.Detections.from_ultralytics(res)
-            except Exception as exc:
+            except Exception:
                 # On failure, give every waiting thread an empty result so
                 # they don't hang forever; the error is logged once here.
-                print(f"BatchInferenceEngine: inference error — {exc}")
+                logger.exception("BatchInferenceEngine: inference error")
                 for req in batch:
                     if req.result is None:
                         req.result = sv.Detections.empty()
@@ -179,7 +190,7 @@ class BatchInferenceEngine:
         with self._queue_ready:
             self._queue_ready.notify_all()
         self._thread.join(timeout=5.0)
-        print("BatchInferenceEngine: shut down")
+        logger.info("BatchInferenceEngine: shut down")
 
     @classmethod
     def reset(cls) -> None:
@@ -203,7 +214,11 @@ class VideoProcessor:
 
     def __init__(self, model_path: str):
         self._engine = BatchInferenceEngine.get_instance(model_path)
-        self.class_names = VEHICLE_CLASSES
+        # Object ndarray so a detection batch's class ids resolve to
+        # names in one fancy-index gather; label_names carries a trailing
+        # 'Unknown' sentinel slot that out-of-range ids are mapped to
+        self.class_names = np.array(VEHICLE_CLASSES, dtype=object)
+        self.label_names = np.append(self.class_names, 'Unknown')
         self.vehicle_capacity = Config.VEHICLE_CAPACITY
 
     def detect(self, image: np.ndarray, threshold: float = None) -> sv.Detections:
@@ -4,10 +4,95 @@ This module holds global state that needs to be accessed by multiple modules
 without causing circular import issues.
 """
 import queue
+import threading
 
-# Frame queues for video streaming (one per camera)
-# Processing service pushes frames, dashboard routes consume them
+
+class SPSCRing:
+    """Lock-free single-producer/single-consumer ring buffer.
+
+    Drop-in for the queue.Queue subset the streaming path uses
+    (put_nowait / get / get_nowait, raising queue.Full / queue.Empty).
+    The producer owns the tail index and the consumer owns the head;
+    under the GIL each index store is atomic, so neither side takes a
+    lock or condition variable on the fast path — queue.Queue pays a
+    mutex plus two condition variables per operation. A threading.Event
+    is only touched when the consumer actually has to sleep.
+
+    The slots hold already-encoded JPEG bytes objects, so items are
+    published by reference; slot contents are written before the tail
+    index, which is what makes the publish safe without a lock.
+    """
+
+    def __init__(self, maxsize: int):
+        self._slots = [None] * maxsize
+        self._size = maxsize
+        self.maxsize = maxsize
+        self._head = 0  # next slot to read (consumer-owned)
+        self._tail = 0  # next slot to write (producer-owned)
+        self._ready = threading.Event()
+
+    def qsize(self) -> int:
+        """Approximate number of buffered items (racy but monotonic-safe)."""
+        return max(self._tail - self._head, 0)
+
+    def put_nowait(self, item) -> None:
+        tail = self._tail
+        if tail - self._head >= self._size:
+            raise queue.Full
+        self._slots[tail % self._size] = item
+        self._tail = tail + 1  # publish only after the slot is written
+        self._ready.set()
+
+    def get_nowait(self):
+        head = self._head
+        if head == self._tail:
+            self._ready.clear()
+            # Re-check: the producer may have published between the
+            # emptiness test and the clear (avoids a lost wakeup)
+            if head == self._tail:
+                raise queue.Empty
+        idx = head % self._size
+        item = self._slots[idx]
+        self._slots[idx] = None  # release the ref promptly
+        self._head = head + 1
+        return item
+
+    def get(self):
+        while True:
+            try:
+                return self.get_nowait()
+            except queue.Empty:
+                self._ready.wait()
+
+    def clear(self) -> int:
+        """Drop all buffered items, returning how many were dropped.
+
+        Called from the job-startup thread, not the consumer, so it only
+        advances the head index — nulling the slots here could race a
+        concurrent get_nowait into returning None. Dropped references
+        linger until the producer overwrites them as the ring wraps
+        (bounded: maxsize JPEG buffers). The worst a head-index race can
+        do is keep or drop one extra preview frame.
+        """
+        head, tail = self._head, self._tail
+        dropped = tail - head
+        if dropped <= 0:
+            return 0
+        self._head = tail
+        return dropped
+
+
+# Socket.IO subscriber counts per processing-session room, maintained by
+# the dashboard join/disconnect handlers. The processing emitters check
+# this before building payloads so headless runs (nobody watching) skip
+# the serialization and broadcast work entirely.
+session_subscribers = {}
+
+
+# Frame rings for video streaming (one per camera)
+# Processing service pushes pre-encoded JPEG bytes, the frame
+# broadcaster consumes them and fans out to MJPEG viewers
 frame_queues = {
-    'ENTRY': queue.Queue(maxsize=10),
-    'EXIT': queue.Queue(maxsize=10)
+    'ENTRY': SPSCRing(maxsize=10),
+    'EXIT': SPSCRing(maxsize=10)
 }
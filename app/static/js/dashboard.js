@@ -203,6 +203,7 @@ class DashboardManager {
         this.socket.on('processing_status', (data) => this.forwardToWorkbench('handleProcessingUpdate', data));
         this.socket.on('processing_progress', (data) => this.forwardToWorkbench('handleProgressUpdate', data));
         this.socket.on('vehicle_event', (data) => this.handleVehicleEvent(data));
+        this.socket.on('processing_tick', (data) => this.handleProcessingTick(data));
         this.socket.on('statistics_update', (data) => this.handleStatisticsUpdate(data));
         this.socket.on('processing_complete', (data) => this.handleProcessingComplete(data));
         this.socket.on('processing_error', (data) => this.handleProcessingError(data));
@@ -221,6 +222,17 @@ class DashboardManager {
         this.addEventToLog(data.event);
     }
 
+    handleProcessingTick(data) {
+        // Combined per-interval update: progress + optional events/stats
+        this.forwardToWorkbench('handleProgressUpdate', data);
+        if (data.events) {
+            data.events.forEach((event) => this.addEventToLog(event));
+        }
+        if (data.statistics) {
+            this.handleStatisticsUpdate(data);
+        }
+    }
+
     handleStatisticsUpdate(data) {
         if (data.camera_role) {
             this.updateCameraStatistics(data.camera_role, data.statistics);
@@ -814,7 +826,9 @@ class WorkbenchManager {
                 this.globalElements.streamUrlInput.disabled = true; // Lock input
                 
                 // Load the captured frame for line drawing
-                await this.loadStreamFrame(this.currentCameraRole, data.frame, data.line_points);
+                await this.loadStreamFrame(this.currentCameraRole,
+                    data.frame_url ? data.frame_url : 'data:image/jpeg;base64,' + data.frame,
+                    data.line_points);
                 this.updateStartButtonState();
             } else {
                 streamStatusDisplay.textContent = data.error || 'Connection failed';
@@ -874,7 +888,7 @@ class WorkbenchManager {
     /**
      * Load a stream frame for line drawing
      */
-    async loadStreamFrame(role, frameBase64, existingLinePoints) {
+    async loadStreamFrame(role, frameSrc, existingLinePoints) {
         const camEls = this.cameraElements[role];
         const config = this.cameraConfigs[role];
 
@@ -886,7 +900,7 @@ class WorkbenchManager {
         // Create LineDrawer
         const canvasId = `${role.toLowerCase()}-canvas`;
         this.lineDrawers[role] = new LineDrawer(canvasId);
-        await this.lineDrawers[role].loadImage('data:image/jpeg;base64,' + frameBase64);
+        await this.lineDrawers[role].loadImage(frameSrc);
 
         // Restore existing line if present
         if (existingLinePoints) {
@@ -1167,7 +1181,7 @@ class WorkbenchManager {
             const response = await fetch(`/setup/get-first-frame?camera_role=${role}`);
             const data = await response.json();
 
-            if (!data.frame) return;
+            if (!data.frame_url && !data.frame) return;
 
             // Update visibility
             if (camEls.placeholder) camEls.placeholder.style.display = 'none';
@@ -1177,7 +1191,12 @@ class WorkbenchManager {
             // Create LineDrawer
             const canvasId = `${role.toLowerCase()}-canvas`;
             this.lineDrawers[role] = new LineDrawer(canvasId);
-            await this.lineDrawers[role].loadImage('data:image/jpeg;base64,' + data.frame);
+            // Binary JPEG route avoids the base64 payload inflation;
+            // legacy base64 field kept as fallback
+            const frameSrc = data.frame_url
+                ? data.frame_url
+                : 'data:image/jpeg;base64,' + data.frame;
+            await this.lineDrawers[role].loadImage(frameSrc);
 
             // Restore existing line if present
             if (data.line_points) {
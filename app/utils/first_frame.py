@@ -0,0 +1,121 @@
+"""
+First-frame extraction helper.
+
+Grabs frame 0 of a video as JPEG bytes for the counting-line setup page.
+Prefers shelling out to ffmpeg (no OpenCV decoder/buffer initialization,
+SIMD scaler does the resize) and falls back to cv2.VideoCapture when
+ffmpeg is unavailable. Results are memoized per (path, mtime) so
+re-loading the setup page never re-decodes the video.
+"""
+
+import os
+import subprocess
+
+from app.config import Config
+
+# Preview quality: libjpeg's default 95 is the slowest tier and oversized
+# for an on-screen preview; 75 cuts encode work and bytes by ~40%
+PREVIEW_JPEG_QUALITY = 75
+
+# ffmpeg's mjpeg quantizer scale (2-31, lower is better); ~7 approximates
+# JPEG quality 75
+_FFMPEG_MJPEG_QSCALE = '7'
+
+# {video_path: (mtime, jpeg_bytes)} — sessions only hold a handful of
+# videos, so a simple dict is sufficient
+_cache = {}
+
+
+def extract_first_frame_jpeg(video_path: str) -> bytes:
+    """
+    Extract the first frame of a video as JPEG bytes at processing size.
+
+    Args:
+        video_path: Path to the video file
+
+    Returns:
+        JPEG-encoded first frame resized to FRAME_WIDTH x FRAME_HEIGHT
+
+    Raises:
+        RuntimeError: If the video cannot be read
+    """
+    try:
+        mtime = os.path.getmtime(video_path)
+    except OSError:
+        raise RuntimeError(f"Video file not found: {video_path}")
+
+    cached = _cache.get(video_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    jpeg_bytes = _extract_with_ffmpeg(video_path)
+    if jpeg_bytes is None:
+        jpeg_bytes = _extract_with_opencv(video_path)
+
+    _cache[video_path] = (mtime, jpeg_bytes)
+    return jpeg_bytes
+
+
+def _extract_with_ffmpeg(video_path: str):
+    """Grab frame 0 via ffmpeg; returns JPEG bytes or None on failure."""
+    cmd = [
+        'ffmpeg', '-y', '-loglevel', 'error', '-ss', '0', '-i', video_path,
+        '-frames:v', '1',
+        '-vf', f'scale={Config.FRAME_WIDTH}:{Config.FRAME_HEIGHT}',
+        '-q:v', _FFMPEG_MJPEG_QSCALE,
+        '-f', 'image2pipe', '-vcodec', 'mjpeg', '-'
+    ]
+    try:
+        proc = subprocess.run(cmd, capture_output=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+
+    if proc.returncode != 0 or not proc.stdout:
+        return None
+    return proc.stdout
+
+
+def _open_capture(video_path: str, cv2):
+    """Open a capture with hardware-accelerated decode when supported.
+
+    VIDEO_ACCELERATION_ANY routes decoding through NVDEC/VAAPI/
+    VideoToolbox where available; plain software open is the fallback.
+    """
+    try:
+        cap = cv2.VideoCapture(
+            video_path, cv2.CAP_FFMPEG,
+            [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+        )
+        if cap.isOpened():
+            return cap
+        cap.release()
+    except (cv2.error, AttributeError):
+        pass
+    return cv2.VideoCapture(video_path)
+
+
+def _extract_with_opencv(video_path: str) -> bytes:
+    """Fallback path: full VideoCapture open + read + resize + encode."""
+    import cv2  # deferred: only needed when ffmpeg is unavailable
+
+    cap = _open_capture(video_path, cv2)
+    try:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        ret, frame = cap.read()
+    finally:
+        cap.release()
+
+    if not ret:
+        raise RuntimeError(f"Unable to read video: {video_path}")
+
+    # INTER_AREA: box filter for downscales — better quality and a
+    # single SIMD pass vs the INTER_LINEAR default
+    frame = cv2.resize(frame, (Config.FRAME_WIDTH, Config.FRAME_HEIGHT),
+                       interpolation=cv2.INTER_AREA)
+    ret, buffer = cv2.imencode(
+        '.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), PREVIEW_JPEG_QUALITY]
+    )
+    if not ret:
+        raise RuntimeError(f"Unable to encode first frame: {video_path}")
+    return buffer.tobytes()
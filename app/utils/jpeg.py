@@ -0,0 +1,40 @@
+"""
+JPEG encoding helper.
+
+Uses PyTurboJPEG (libjpeg-turbo SIMD bindings) when available — typically
+2-4x faster than OpenCV's built-in encoder at the same quality — and
+falls back to cv2.imencode otherwise so the dependency stays optional.
+"""
+
+import numpy as np
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    _turbo = TurboJPEG()
+except Exception:
+    _turbo = None
+
+
+def encode_jpeg(frame: np.ndarray, quality: int = 85) -> bytes:
+    """
+    Encode a BGR frame to JPEG bytes.
+
+    Args:
+        frame: BGR image as a numpy array
+        quality: JPEG quality (1-100)
+
+    Returns:
+        Encoded JPEG bytes
+
+    Raises:
+        RuntimeError: If encoding fails
+    """
+    if _turbo is not None:
+        return _turbo.encode(frame, quality=quality, pixel_format=TJPF_BGR)
+
+    import cv2  # deferred: only the fallback path needs OpenCV
+
+    ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ret:
+        raise RuntimeError("JPEG encoding failed")
+    return buffer.tobytes()
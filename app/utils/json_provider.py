@@ -0,0 +1,28 @@
+"""
+orjson-backed Flask JSON provider.
+
+orjson serializes several times faster than the stdlib json module and
+produces bytes directly, skipping a UTF-8 encode pass — a win for the
+dashboard endpoints that are polled every 1-2 seconds. The provider is
+only installed when orjson is importable, so the dependency stays
+optional.
+"""
+
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider delegating to orjson."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        # OPT_SERIALIZE_NUMPY lets handlers return numpy scalars from
+        # detection results without explicit casts
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
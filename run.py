@@ -1,3 +1,11 @@
+import os
+
+# eventlet must monkey-patch the stdlib before anything else is imported
+# for SOCKETIO_ASYNC_MODE='eventlet' to work correctly
+if os.environ.get('SOCKETIO_ASYNC_MODE') == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
+
 from app import create_app, socketio
 
 app = create_app()